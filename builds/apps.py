@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class BuildsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'builds'
+    
+    def ready(self):
+        """Import signal handlers when the app is ready."""
+        import builds.signals  # noqa
@@ -0,0 +1,154 @@
+"""
+Utilitaires communs pour les tests CSRF.
+
+Charge l'app GitHub allauth nécessaire au rendu de /accounts/github/login/
+(fixture github_oauth.json), le vidage du cache des builds du proxy avant
+chaque test, un aller-retour GET -> extraction du token -> POST réutilisable,
+extract_csrf() qui analyse cookies + HTML une seule fois par réponse,
+fake_response() pour simuler les réponses `requests` du conteneur, et
+login_form_html() pour la page de login servie par le conteneur.
+"""
+import io
+import re
+import weakref
+from types import SimpleNamespace
+
+import requests
+
+from django.core.cache import cache
+from django.test import TestCase, Client
+
+# Champ caché csrfmiddlewaretoken des formulaires, cherché directement dans
+# les octets du HTML (partagé par tous les tests CSRF)
+_CSRF_INPUT_RE = re.compile(rb'name=["\']csrfmiddlewaretoken["\'] value=["\']([^"\']+)["\']')
+
+# Résultats de extract_csrf(), libérés en même temps que la réponse
+_CSRF_CACHE = weakref.WeakKeyDictionary()
+
+# Formulaire de login du conteneur, pré-encodé de part et d'autre du token
+_LOGIN_FORM_PREFIX = b'''
+        <html>
+        <body>
+            <form method="post" action="/login/">
+                <input type="hidden" name="csrfmiddlewaretoken" value="'''
+_LOGIN_FORM_SUFFIX = b'''">
+                <input type="text" name="username">
+                <input type="password" name="password">
+                <button type="submit">Login</button>
+            </form>
+        </body>
+        </html>
+        '''
+
+
+def extract_csrf(response):
+    """
+    Extrait le cookie CSRF et le token du formulaire d'une réponse.
+    
+    Les cookies sont parcourus et le HTML analysé une seule fois par réponse;
+    les appels suivants sont servis depuis le cache.
+    
+    Returns:
+        Tuple (cookie_name, cookie_value, token), None pour les éléments absents
+    """
+    try:
+        return _CSRF_CACHE[response]
+    except KeyError:
+        pass
+    
+    # Premier cookie dont le nom contient 'csrf'
+    cookie_name = cookie_value = None
+    for name, morsel in response.cookies.items():
+        if 'csrf' in name.lower():
+            cookie_name, cookie_value = name, morsel.value
+            break
+    
+    match = _CSRF_INPUT_RE.search(response.content)
+    token = match.group(1).decode() if match else None
+    
+    result = _CSRF_CACHE[response] = (cookie_name, cookie_value, token)
+    return result
+
+
+def login_form_html(token):
+    """HTML (bytes) d'un formulaire de login contenant le token CSRF `token`."""
+    return _LOGIN_FORM_PREFIX + token.encode('utf-8') + _LOGIN_FORM_SUFFIX
+
+
+def fake_response(status=200, headers=None, content=b'', cookies=None):
+    """
+    Réponse `requests` minimale pour les tests du proxy.
+    
+    SimpleNamespace plutôt que Mock: pas d'attributs créés à la volée
+    ni d'historique d'appels à chaque accès. iter_content() découpe
+    réellement le contenu, comme une réponse en streaming, et raw
+    expose les mêmes octets sous forme de flux.
+    """
+    def iter_content(chunk_size=1):
+        for start in range(0, len(content), chunk_size):
+            yield content[start:start + chunk_size]
+    
+    return SimpleNamespace(
+        status_code=status,
+        headers=headers or {},
+        content=content,
+        raw=io.BytesIO(content),
+        cookies=cookies if cookies is not None else requests.cookies.RequestsCookieJar(),
+        iter_content=iter_content,
+    )
+
+
+class _ProxyCacheTestCase(TestCase):
+    """TestCase qui vide le cache des builds du proxy avant chaque test."""
+    
+    def setUp(self):
+        super().setUp()
+        # Le cache n'est pas annulé avec la transaction du test: sans cela,
+        # un build mis en cache par une autre classe (même id) fuiterait
+        cache.clear()
+
+
+class _CSRFBaseTestCase(_ProxyCacheTestCase):
+    """Setup GitHub OAuth + helper d'aller-retour CSRF."""
+    
+    # Site + app GitHub allauth
+    fixtures = ['github_oauth.json']
+    
+    def _extract_csrf_token(self, response):
+        """
+        Retourne le token CSRF du formulaire.
+        
+        Utilise le contexte du template si disponible, sinon le HTML.
+        """
+        if response.context:
+            csrf_token = response.context.get('csrf_token')
+            if csrf_token:
+                return str(csrf_token)
+        
+        return extract_csrf(response)[2]
+    
+    def _csrf_roundtrip(self, url, client=None, extra_cookies=None):
+        """
+        GET de `url`, extraction du token CSRF, puis POST du token.
+        
+        Args:
+            url: URL du formulaire
+            client: Client à utiliser (par défaut un Client avec vérification CSRF)
+            extra_cookies: Cookies à poser sur le client avant le GET
+        
+        Returns:
+            Tuple (get_response, post_response)
+        """
+        client = client or Client(enforce_csrf_checks=True)
+        
+        if extra_cookies:
+            for name, value in extra_cookies.items():
+                client.cookies[name] = value
+        
+        get_response = client.get(url)
+        csrf_token = self._extract_csrf_token(get_response)
+        self.assertIsNotNone(csrf_token, "Token CSRF introuvable dans le formulaire")
+        
+        post_response = client.post(url, data={'csrfmiddlewaretoken': csrf_token})
+        
+        return get_response, post_response
@@ -2,29 +2,44 @@
 Docker container management utilities.
 """
 import logging
+import os
 import subprocess
 import socket
+import tempfile
 from typing import Optional, Tuple
 
+from django.conf import settings
+
 logger = logging.getLogger(__name__)
 
+# Above this many environment variables, start_container passes them to
+# `docker run` through a single --env-file instead of one -e flag each
+ENV_FILE_THRESHOLD = 4
+
+# Docker Engine API client shared by all start_container calls (see _get_docker_client)
+_DOCKER = None
+
 
 class DockerError(Exception):
     """Exception raised for Docker-related errors."""
     pass
 
 
-def find_available_port(start_port: int = 8000, max_attempts: int = 100) -> int:
+def find_available_port(start_port: Optional[int] = None, max_attempts: int = 100) -> int:
     """
     Find an available port on the host.
     
+    Without a start_port, the kernel hands out a free ephemeral port in a
+    single bind() (the same range Docker picks from for unpublished ports).
+    With a start_port, ports are probed upwards from it.
+    
     Note: There's an inherent race condition between checking port availability
     and actually binding to it. The start_container function implements retry
     logic to handle this case.
     
     Args:
-        start_port: Starting port number to check
-        max_attempts: Maximum number of ports to try
+        start_port: Starting port number to check, or None for any free port
+        max_attempts: Maximum number of ports to try from start_port
         
     Returns:
         An available port number
@@ -32,9 +47,20 @@ def find_available_port(start_port: int = 8000, max_attempts: int = 100) -> int:
     Raises:
         DockerError: If no available port is found
     """
+    if not start_port:
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                s.bind(('localhost', 0))
+                return s.getsockname()[1]
+        except OSError as e:
+            raise DockerError(f"No available port found: {e}")
+    
     for port in range(start_port, start_port + max_attempts):
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                # Ports left in TIME_WAIT by a stopped container are reusable
+                s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 s.bind(('localhost', port))
                 return port
         except OSError:
@@ -42,6 +68,20 @@ def find_available_port(start_port: int = 8000, max_attempts: int = 100) -> int:
     raise DockerError(f"No available port found between {start_port} and {start_port + max_attempts}")
 
 
+def _get_docker_client():
+    """
+    Return the shared Docker Engine API client, creating it on first use.
+    
+    The client talks to the daemon over its UNIX socket and keeps the
+    connection alive between calls, instead of forking the `docker` CLI.
+    """
+    global _DOCKER
+    if _DOCKER is None:
+        import docker
+        _DOCKER = docker.APIClient(base_url='unix://var/run/docker.sock', version='auto')
+    return _DOCKER
+
+
 def start_container(
     image_tag: str,
     container_port: int,
@@ -67,6 +107,98 @@ def start_container(
     Raises:
         DockerError: If container fails to start after all retries
     """
+    if getattr(settings, 'DOCKER_USE_SDK', False):
+        return _start_container_sdk(image_tag, container_port, host_port, container_name, env_vars)
+    
+    # Environment variables: one --env-file for many variables (the env-file
+    # format is one KEY=VALUE per line, so multi-line values need -e)
+    env_args = []
+    env_file_path = None
+    if env_vars:
+        if len(env_vars) > ENV_FILE_THRESHOLD and not any('\n' in str(v) for v in env_vars.values()):
+            with tempfile.NamedTemporaryFile('w', suffix='.env', delete=False) as env_file:
+                env_file.writelines(f'{key}={value}\n' for key, value in env_vars.items())
+            env_file_path = env_file.name
+            env_args = ['--env-file', env_file_path]
+        else:
+            for key, value in env_vars.items():
+                env_args.extend(['-e', f'{key}={value}'])
+    
+    try:
+        return _run_container(
+            image_tag, container_port, host_port, container_name, max_retries, env_args
+        )
+    finally:
+        if env_file_path:
+            os.unlink(env_file_path)
+
+
+def _start_container_sdk(
+    image_tag: str,
+    container_port: int,
+    host_port: Optional[int],
+    container_name: Optional[str],
+    env_vars: Optional[dict],
+) -> Tuple[str, int]:
+    """
+    Start a container through the Docker Engine API (see start_container).
+    
+    Without an explicit host_port, Docker assigns a free one, so there is
+    no port conflict to retry on.
+    """
+    import docker
+    
+    client = _get_docker_client()
+    container_id = None
+    try:
+        container = client.create_container(
+            image=image_tag,
+            environment=env_vars,
+            ports=[container_port],
+            name=container_name,
+            host_config=client.create_host_config(port_bindings={container_port: host_port}),
+        )
+        container_id = container['Id']
+        client.start(container=container_id)
+        bindings = client.port(container_id, container_port)
+    except docker.errors.DockerException as e:
+        if container_id:
+            _remove_sdk_container(client, container_id)
+        if host_port is not None and 'port is already allocated' in str(e).lower():
+            raise DockerError(f"Port {host_port} is already in use")
+        raise DockerError(f"Failed to start container: {e}")
+    
+    # None or [] if the container already exited or the port was not published
+    if not bindings:
+        _remove_sdk_container(client, container_id)
+        raise DockerError(
+            f"Failed to start container: no host port binding for {container_port}"
+        )
+    current_port = int(bindings[0]['HostPort'])
+    
+    logger.info(f"Started container {container_id[:12]} on port {current_port}")
+    return container_id, current_port
+
+
+def _remove_sdk_container(client, container_id: str) -> None:
+    """Force-remove a container that failed to start, ignoring API errors."""
+    import docker
+    
+    try:
+        client.remove_container(container_id, force=True)
+    except docker.errors.DockerException:
+        pass
+
+
+def _run_container(
+    image_tag: str,
+    container_port: int,
+    host_port: Optional[int],
+    container_name: Optional[str],
+    max_retries: int,
+    env_args: list,
+) -> Tuple[str, int]:
+    """Run `docker run`, retrying on port conflicts (see start_container)."""
     last_error = None
     
     for attempt in range(max_retries):
@@ -80,9 +212,7 @@ def start_container(
             ]
             
             # Add environment variables if provided
-            if env_vars:
-                for key, value in env_vars.items():
-                    cmd.extend(['-e', f'{key}={value}'])
+            cmd.extend(env_args)
             
             if container_name:
                 # Add attempt number to avoid name conflicts on retry
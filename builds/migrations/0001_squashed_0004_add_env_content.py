@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-16 08:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    replaces = [('builds', '0001_initial'), ('builds', '0002_build_container_id_build_container_port_and_more'), ('builds', '0003_add_dockerfile_configuration'), ('builds', '0004_add_env_content')]
+
+    initial = True
+
+    dependencies = [
+        ('projects', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Build',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('success', 'Success'), ('failed', 'Failed'), ('cancelled', 'Cancelled')], default='pending', max_length=20)),
+                ('branch_name', models.CharField(help_text='Branch name at build time', max_length=255)),
+                ('image_tag', models.CharField(blank=True, help_text='Generated Docker image tag', max_length=255)),
+                ('logs', models.TextField(blank=True, help_text='Build logs')),
+                ('error_message', models.TextField(blank=True, help_text='Error message if failed')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('push_to_registry', models.BooleanField(default=False, help_text='Whether to push image to registry')),
+                ('deploy_after_build', models.BooleanField(default=False, help_text='Whether to deploy after successful build')),
+                ('commit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='builds', to='projects.commit')),
+                ('repository', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='builds', to='projects.gitrepository')),
+                ('container_id', models.CharField(blank=True, help_text='Docker container ID when running', max_length=64)),
+                ('container_port', models.IntegerField(default=8080, help_text='Port to expose from the container')),
+                ('container_status', models.CharField(choices=[('none', 'Not Started'), ('starting', 'Starting'), ('running', 'Running'), ('stopped', 'Stopped'), ('error', 'Error')], default='none', max_length=20)),
+                ('host_port', models.IntegerField(blank=True, help_text='Host port mapped to container port', null=True)),
+                ('dockerfile_content', models.TextField(blank=True, default='# Auto-generated Dockerfile\nFROM python:3.11-slim\n\nWORKDIR /app\n\n# Copy requirements first for better caching\nCOPY requirements.txt* ./\nRUN pip install --no-cache-dir -r requirements.txt || true\n\n# Copy application code\nCOPY . .\n\n# Expose the application port\nEXPOSE 8080\n\n# Default command (customize as needed)\nCMD ["python", "-m", "http.server", "8080"]\n', help_text='Custom Dockerfile content')),
+                ('dockerfile_path', models.CharField(blank=True, default='Dockerfile', help_text='Path to Dockerfile in repository', max_length=255)),
+                ('dockerfile_source', models.CharField(choices=[('generated', 'Auto-generated'), ('custom', 'Custom Content'), ('repo_file', 'File from Repository')], default='generated', help_text='Source of the Dockerfile', max_length=20)),
+                ('env_content', models.TextField(blank=True, default='', help_text='Environment variables content (.env file)')),
+            ],
+            options={
+                'verbose_name': 'Build',
+                'verbose_name_plural': 'Builds',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from projects.models import GitRepository, Commit
 from pathlib import Path
+from types import MappingProxyType
+import functools
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,10 +11,12 @@ logger = logging.getLogger(__name__)
 DOCKERFILE_TEMPLATES_DIR = Path(__file__).parent / 'dockerfile_templates'
 
 
+@functools.lru_cache(maxsize=None)
 def get_dockerfile_templates():
     """
     Load all Dockerfile templates from the templates directory.
-    Returns a dictionary of {template_name: template_content}, sorted alphabetically by name.
+    Returns a read-only mapping of {template_name: template_content}, sorted alphabetically by name.
+    The directory is read once per process and the mapping is shared by all callers.
     """
     templates = {}
     
@@ -27,7 +31,7 @@ def get_dockerfile_templates():
                 logger.warning(f"Failed to read Dockerfile template '{template_name}': {e}")
     
     # Return templates sorted alphabetically by name
-    return dict(sorted(templates.items()))
+    return MappingProxyType(dict(sorted(templates.items())))
 
 
 def get_env_templates():
@@ -100,6 +104,10 @@ EXPOSE 8080
 CMD ["python", "-m", "http.server", "8080"]
 """
 
+# Cache key of the build fields used by the container proxy (see builds.views);
+# deleted by builds.signals whenever the build is saved or deleted
+PROXY_BUILD_CACHE_KEY = 'proxy-build:{}'
+
 
 class Build(models.Model):
     """
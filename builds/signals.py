@@ -0,0 +1,21 @@
+"""
+Signal handlers for the builds app.
+"""
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Build, PROXY_BUILD_CACHE_KEY
+
+
+@receiver(post_save, sender=Build)
+@receiver(post_delete, sender=Build)
+def invalidate_proxy_build_cache(sender, instance, **kwargs):
+    """
+    Drop the container proxy's cached copy of a build when it changes.
+    
+    Covers container start/stop, status syncs and deletions. Only the cache
+    of the current process is cleared when it is process-local (the default
+    LocMemCache); other processes expire their copy after the cache timeout.
+    """
+    cache.delete(PROXY_BUILD_CACHE_KEY.format(instance.pk))
@@ -6,30 +6,15 @@ Ce test vérifie:
 2. Que le flux CSRF fonctionne correctement après le nettoyage
 3. Qu'un utilisateur avec des anciens cookies peut se connecter sans erreur 403
 """
-from django.test import TestCase, Client
-from django.contrib.sites.models import Site
-from allauth.socialaccount.models import SocialApp
-import re
+from builds.csrf_test_base import _CSRFBaseTestCase
+import logging
 
+logger = logging.getLogger(__name__)
 
-class CSRFIntegrationFinalTest(TestCase):
+
+class CSRFIntegrationFinalTest(_CSRFBaseTestCase):
     """Test d'intégration final vérifiant que le problème CSRF est résolu."""
     
-    def setUp(self):
-        """Setup GitHub OAuth."""
-        self.site = Site.objects.get_or_create(
-            id=1,
-            defaults={'domain': 'testserver', 'name': 'Test Site'}
-        )[0]
-        
-        self.github_app = SocialApp.objects.create(
-            provider='github',
-            name='GitHub Test',
-            client_id='test-client-id',
-            secret='test-secret'
-        )
-        self.github_app.sites.add(self.site)
-    
     def test_user_with_old_cookies_can_login(self):
         """
         Test d'intégration final: Un utilisateur avec d'anciens cookies peut se connecter.
@@ -41,89 +26,63 @@ class CSRFIntegrationFinalTest(TestCase):
         4. L'utilisateur soumet le formulaire
         5. Succès! Pas d'erreur 403
         """
-        print("\n" + "="*70)
-        print(" TEST D'INTÉGRATION FINAL: Résolution du problème CSRF ")
-        print("="*70)
-        
-        client = Client(enforce_csrf_checks=True)
+        logger.debug("\n" + "="*70)
+        logger.debug(" TEST D'INTÉGRATION FINAL: Résolution du problème CSRF ")
+        logger.debug("="*70)
         
         # SITUATION INITIALE: L'utilisateur a un ancien cookie
-        print("\n[SITUATION INITIALE]")
-        print("  L'utilisateur a un ancien cookie 'csrftoken' dans son navigateur")
-        print("  (Resté d'une ancienne version de NoHands)")
-        client.cookies['csrftoken'] = 'OLD_PROBLEMATIC_TOKEN'
-        
-        # ÉTAPE 1: GET de la page de login
-        print("\n[ÉTAPE 1] GET /accounts/github/login/")
-        response = client.get('/accounts/github/login/')
+        logger.debug("\n[SITUATION INITIALE]")
+        logger.debug("  L'utilisateur a un ancien cookie 'csrftoken' dans son navigateur")
+        logger.debug("  (Resté d'une ancienne version de NoHands)")
+        
+        # ÉTAPE 1: GET de la page de login, ÉTAPE 2: POST du formulaire
+        logger.debug("\n[ÉTAPES 1-2] GET + POST /accounts/github/login/")
+        get_response, response = self._csrf_roundtrip(
+            '/accounts/github/login/',
+            extra_cookies={'csrftoken': 'OLD_PROBLEMATIC_TOKEN'}
+        )
         
-        print(f"  Status: {response.status_code}")
-        self.assertEqual(response.status_code, 200)
+        logger.debug("  Status GET: %s", get_response.status_code)
+        self.assertEqual(get_response.status_code, 200)
         
         # Vérifier que le middleware a expiré l'ancien cookie
-        print(f"  Cookies dans la réponse: {list(response.cookies.keys())}")
+        cookies = get_response.cookies
+        logger.debug("  Cookies dans la réponse: %s", list(cookies.keys()))
         
-        if 'csrftoken' in response.cookies:
-            old_cookie = response.cookies['csrftoken']
-            print(f"  ✓ Middleware a expiré 'csrftoken' (max-age={old_cookie['max-age']})")
+        if 'csrftoken' in cookies:
+            old_cookie = cookies['csrftoken']
+            logger.debug("  ✓ Middleware a expiré 'csrftoken' (max-age=%s)", old_cookie['max-age'])
             self.assertEqual(old_cookie['max-age'], 0)
         
         # Nouveau cookie CSRF défini
-        self.assertIn('nohands_csrftoken', response.cookies)
-        new_csrf = response.cookies['nohands_csrftoken'].value
-        print(f"  ✓ Nouveau cookie 'nohands_csrftoken' défini: {new_csrf[:20]}...")
+        self.assertIn('nohands_csrftoken', cookies)
+        new_csrf = cookies['nohands_csrftoken'].value
+        logger.debug("  ✓ Nouveau cookie 'nohands_csrftoken' défini: %s...", new_csrf[:20])
         
-        # Extraire le token du formulaire
-        html = response.content.decode('utf-8')
-        match = re.search(r'name=["\']csrfmiddlewaretoken["\'] value=["\']([^"\']+)["\']', html)
-        self.assertIsNotNone(match)
-        csrf_token = match.group(1)
-        print(f"  ✓ Token CSRF dans le formulaire: {csrf_token[:20]}...")
-        
-        # ÉTAPE 2: POST du formulaire
-        print("\n[ÉTAPE 2] POST /accounts/github/login/")
-        print("  L'utilisateur clique sur 'Se connecter'")
-        
-        post_data = {
-            'csrfmiddlewaretoken': csrf_token,
-        }
-        
-        response = client.post('/accounts/github/login/', data=post_data)
-        
-        print(f"  Status de la réponse: {response.status_code}")
+        logger.debug("  Status de la réponse POST: %s", response.status_code)
         
         # VÉRIFICATION FINALE: Pas d'erreur 403!
         if response.status_code == 403:
-            print("\n" + "!"*70)
-            print("  ❌ ÉCHEC: Erreur 403 CSRF détectée!")
-            print("!"*70)
+            logger.debug("\n" + "!"*70)
+            logger.debug("  ❌ ÉCHEC: Erreur 403 CSRF détectée!")
+            logger.debug("!"*70)
             self.fail("Le problème CSRF n'est PAS résolu - erreur 403 détectée")
         
         self.assertNotEqual(response.status_code, 403)
         
-        print("\n" + "="*70)
-        print(" ✅ SUCCÈS: Pas d'erreur 403!")
-        print(" ✅ L'utilisateur peut se connecter sans problème")
-        print(" ✅ Le problème CSRF est RÉSOLU")
-        print("="*70)
+        logger.debug("\n" + "="*70)
+        logger.debug(" ✅ SUCCÈS: Pas d'erreur 403!")
+        logger.debug(" ✅ L'utilisateur peut se connecter sans problème")
+        logger.debug(" ✅ Le problème CSRF est RÉSOLU")
+        logger.debug("="*70)
     
     def test_clean_slate_user_can_login(self):
         """Test qu'un utilisateur sans anciens cookies peut aussi se connecter."""
-        print("\n[TEST BONUS] Utilisateur sans anciens cookies")
-        
-        client = Client(enforce_csrf_checks=True)
+        logger.debug("\n[TEST BONUS] Utilisateur sans anciens cookies")
         
         # Pas d'anciens cookies
-        response = client.get('/accounts/github/login/')
-        self.assertEqual(response.status_code, 200)
-        
-        # Extraire token
-        html = response.content.decode('utf-8')
-        match = re.search(r'name=["\']csrfmiddlewaretoken["\'] value=["\']([^"\']+)["\']', html)
-        csrf_token = match.group(1)
-        
-        # POST
-        response = client.post('/accounts/github/login/', data={'csrfmiddlewaretoken': csrf_token})
+        get_response, response = self._csrf_roundtrip('/accounts/github/login/')
+        self.assertEqual(get_response.status_code, 200)
         
         self.assertNotEqual(response.status_code, 403)
-        print("  ✅ Fonctionne aussi sans anciens cookies")
+        logger.debug("  ✅ Fonctionne aussi sans anciens cookies")
@@ -20,7 +20,11 @@ from django.contrib.auth import get_user_model
 from builds.models import Build
 from builds.dagger_pipeline import run_build_sync
 from builds.docker_utils import start_container, stop_container, remove_container, get_container_status
+from builds.csrf_test_base import _CSRF_INPUT_RE
 from projects.models import GitRepository, Branch, Commit
+import logging
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
@@ -199,18 +203,18 @@ application = get_wsgi_application()
         4. Tester CSRF (GET + POST)
         5. Nettoyer
         """
-        print("\n" + "="*60)
-        print("TEST D'INTÉGRATION CSRF - DÉBUT")
-        print("="*60)
+        logger.debug("\n" + "="*60)
+        logger.debug("TEST D'INTÉGRATION CSRF - DÉBUT")
+        logger.debug("="*60)
         
         # Étape 1: Créer le projet test
-        print("\n[1/6] Création du projet Django test...")
+        logger.debug("\n[1/6] Création du projet Django test...")
         temp_dir, project_dir = self._create_django_test_project()
         self.__class__.temp_repo_dir = temp_dir
-        print(f"    Projet créé dans: {project_dir}")
+        logger.debug("    Projet créé dans: %s", project_dir)
         
         # Étape 2: Créer les objets Django (repo, branch, commit, build)
-        print("\n[2/6] Création des objets Django (GitRepository, Commit, Build)...")
+        logger.debug("\n[2/6] Création des objets Django (GitRepository, Commit, Build)...")
         repo = GitRepository.objects.create(
             name='test-csrf-repo',
             url=f'file://{temp_dir}',
@@ -246,11 +250,11 @@ application = get_wsgi_application()
             dockerfile_content=dockerfile_content,
             status='pending'
         )
-        print(f"    Build #{build.id} créé")
+        logger.debug("    Build #%s créé", build.id)
         
         # Étape 3: Lancer le build Dagger
-        print("\n[3/6] Lancement du build Dagger (cela peut prendre 1-2 minutes)...")
-        print("    NOTE: Le nouveau Dockerfile désactive automatiquement CSRF")
+        logger.debug("\n[3/6] Lancement du build Dagger (cela peut prendre 1-2 minutes)...")
+        logger.debug("    NOTE: Le nouveau Dockerfile désactive automatiquement CSRF")
         
         try:
             # Créer un Dockerfile temporaire
@@ -277,17 +281,17 @@ application = get_wsgi_application()
             build.image_tag = full_image_tag
             build.save()
             
-            print(f"    ✓ Build réussi: {full_image_tag}")
-            print(f"    Logs du build:")
+            logger.debug("    ✓ Build réussi: %s", full_image_tag)
+            logger.debug("    Logs du build:")
             for line in result.logs.split('\n')[-10:]:
                 if line.strip():
-                    print(f"      {line}")
+                    logger.debug("      %s", line)
             
         except Exception as e:
             self.fail(f"Dagger build failed: {e}")
         
         # Étape 4: Démarrer le conteneur
-        print("\n[4/6] Démarrage du conteneur...")
+        logger.debug("\n[4/6] Démarrage du conteneur...")
         
         try:
             container_id, host_port = start_container(
@@ -303,54 +307,52 @@ application = get_wsgi_application()
             build.container_status = 'running'
             build.save()
             
-            print(f"    ✓ Conteneur démarré: {container_id[:12]}")
-            print(f"    ✓ Port host: {host_port}")
+            logger.debug("    ✓ Conteneur démarré: %s", container_id[:12])
+            logger.debug("    ✓ Port host: %s", host_port)
             
             # Attendre que le conteneur soit prêt
-            print("    Attente que Django démarre dans le conteneur...")
+            logger.debug("    Attente que Django démarre dans le conteneur...")
             time.sleep(5)  # Laisser Django démarrer
             
             # Vérifier que le conteneur est bien running
             status = get_container_status(container_id)
             self.assertEqual(status, 'running', f"Container not running: {status}")
-            print("    ✓ Conteneur opérationnel")
+            logger.debug("    ✓ Conteneur opérationnel")
             
         except Exception as e:
             self.fail(f"Failed to start container: {e}")
         
         # Étape 5: Tester le flux CSRF via le proxy
-        print("\n[5/6] Test du flux CSRF via le proxy NoHands...")
+        logger.debug("\n[5/6] Test du flux CSRF via le proxy NoHands...")
         
         # GET de la page login
-        print("    GET /builds/{}/fwd/login/".format(build.id))
+        logger.debug("    GET /builds/%s/fwd/login/", build.id)
         response = self.client.get(f'/builds/{build.id}/fwd/login/')
         
         self.assertEqual(response.status_code, 200, f"GET failed: {response.status_code}")
-        print(f"    ✓ GET réussi (status {response.status_code})")
+        logger.debug("    ✓ GET réussi (status %s)", response.status_code)
         
         # Vérifier que le cookie csrftoken est défini
         self.assertIn('csrftoken', response.cookies, "No csrftoken cookie set")
         csrf_cookie = response.cookies['csrftoken'].value
-        print(f"    ✓ Cookie csrftoken défini: {csrf_cookie[:20]}...")
+        logger.debug("    ✓ Cookie csrftoken défini: %s...", csrf_cookie[:20])
         
         # Vérifier le path du cookie
         cookie_path = response.cookies['csrftoken'].get('path')
         expected_path = f'/builds/{build.id}/fwd/'
         self.assertEqual(cookie_path, expected_path, f"Cookie path incorrect: {cookie_path}")
-        print(f"    ✓ Cookie path correct: {cookie_path}")
+        logger.debug("    ✓ Cookie path correct: %s", cookie_path)
         
         # Extraire le token CSRF du HTML
-        html = response.content.decode('utf-8')
-        self.assertIn('csrfmiddlewaretoken', html, "No CSRF token in HTML")
+        self.assertIn(b'csrfmiddlewaretoken', response.content, "No CSRF token in HTML")
         
-        import re
-        match = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', html)
+        match = _CSRF_INPUT_RE.search(response.content)
         self.assertIsNotNone(match, "Could not extract CSRF token from HTML")
-        html_token = match.group(1)
-        print(f"    ✓ Token CSRF dans HTML: {html_token[:20]}...")
+        html_token = match.group(1).decode()
+        logger.debug("    ✓ Token CSRF dans HTML: %s...", html_token[:20])
         
         # POST du formulaire
-        print("    POST /builds/{}/fwd/login/".format(build.id))
+        logger.debug("    POST /builds/%s/fwd/login/", build.id)
         post_data = {
             'csrfmiddlewaretoken': html_token,
             'username': 'testuser',
@@ -363,7 +365,7 @@ application = get_wsgi_application()
             follow=False
         )
         
-        print(f"    Status POST: {response.status_code}")
+        logger.debug("    Status POST: %s", response.status_code)
         
         # LE TEST CRUCIAL: Pas d'erreur 403!
         self.assertNotEqual(
@@ -383,23 +385,23 @@ application = get_wsgi_application()
         content = response.content.decode('utf-8')
         self.assertIn('Login successful!', content, f"Unexpected response: {content[:100]}")
         
-        print("    ✓ POST réussi sans erreur 403!")
-        print("    ✓ CSRF fonctionne correctement!")
+        logger.debug("    ✓ POST réussi sans erreur 403!")
+        logger.debug("    ✓ CSRF fonctionne correctement!")
         
         # Étape 6: Nettoyer
-        print("\n[6/6] Nettoyage...")
+        logger.debug("\n[6/6] Nettoyage...")
         try:
             stop_container(container_id)
             remove_container(container_id)
             self.__class__.container_id = None
-            print("    ✓ Conteneur arrêté et supprimé")
+            logger.debug("    ✓ Conteneur arrêté et supprimé")
         except Exception as e:
-            print(f"    ⚠️  Erreur lors du nettoyage: {e}")
+            logger.debug("    ⚠️  Erreur lors du nettoyage: %s", e)
         
-        print("\n" + "="*60)
-        print("TEST D'INTÉGRATION CSRF - SUCCÈS ✅")
-        print("="*60)
-        print("""
+        logger.debug("\n" + "="*60)
+        logger.debug("TEST D'INTÉGRATION CSRF - SUCCÈS ✅")
+        logger.debug("="*60)
+        logger.debug("""
 RÉSUMÉ:
 - Projet Django créé dynamiquement ✓
 - Image Docker construite avec Dagger ✓
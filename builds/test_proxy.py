@@ -1,55 +1,56 @@
 """
 Tests for the container proxy functionality.
 """
-from django.test import TestCase, Client, RequestFactory
+from django.test import TestCase, RequestFactory
 from django.contrib.auth.models import User
 from django.urls import reverse
-from unittest.mock import patch, Mock, MagicMock
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from unittest.mock import patch, Mock
 from datetime import datetime, timezone
+import os
 import requests
 
 from builds.models import Build
 from builds.views import proxy_to_container
 from builds.docker_utils import start_container
 from projects.models import GitRepository, Commit
+from builds.csrf_test_base import fake_response
 
 
 def create_mock_response(status_code=200, content=b'', headers=None, cookies=None):
-    """Helper function to create a properly configured mock response."""
-    mock_response = Mock()
-    mock_response.status_code = status_code
-    mock_response.content = content
-    mock_response.headers = headers or {'content-type': 'text/html; charset=utf-8'}
-    mock_response.cookies = cookies or []  # Empty list by default
-    mock_response.iter_content = lambda chunk_size: [content]
-    return mock_response
+    """Helper function to create a fake container response (HTML by default)."""
+    return fake_response(
+        status=status_code,
+        headers=headers or {'content-type': 'text/html; charset=utf-8'},
+        content=content,
+        cookies=cookies,
+    )
 
 
-class ProxyURLRewritingTests(TestCase):
-    """Test that URLs are correctly rewritten in proxied responses."""
+class ProxyTestCase(TestCase):
+    """Base class providing a user and a running build, created once per class."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(username='testuser', password='testpass')
-        self.client = Client()
-        self.client.login(username='testuser', password='testpass')
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password='testpass')
         
-        # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name='test-repo',
             url='https://github.com/test/repo.git',
-            user=self.user
+            user=cls.user
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha='abc123',
             message='test commit',
             author='Test Author',
             author_email='test@example.com',
             committed_at=datetime.now(timezone.utc)
         )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
+        cls.build = Build.objects.create(
+            repository=cls.repo,
+            commit=cls.commit,
             branch_name='main',
             container_port=8000,
             container_status='running',
@@ -58,8 +59,20 @@ class ProxyURLRewritingTests(TestCase):
             status='success'
         )
     
-    @patch('builds.views.requests.get')
-    def test_absolute_urls_rewritten_in_html(self, mock_get):
+    def setUp(self):
+        # The proxy's build cache is not rolled back with the test transaction
+        cache.clear()
+
+
+class ProxyURLRewritingTests(ProxyTestCase):
+    """Test that URLs are correctly rewritten in proxied responses."""
+    
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+    
+    @patch('builds.views._SESSION.request')
+    def test_absolute_urls_rewritten_in_html(self, mock_request):
         """Test that absolute URLs are rewritten in HTML responses."""
         # Mock response with absolute URLs
         html_content = b'''
@@ -68,7 +81,7 @@ class ProxyURLRewritingTests(TestCase):
             <a href="http://127.0.0.1:9000/admin/">Admin</a>
         </html>
         '''
-        mock_get.return_value = create_mock_response(content=html_content)
+        mock_request.return_value = create_mock_response(content=html_content)
         
         response = self.client.get(f'/builds/{self.build.id}/fwd/')
         
@@ -77,9 +90,10 @@ class ProxyURLRewritingTests(TestCase):
         self.assertIn(f'/builds/{self.build.id}/fwd/page', content)
         self.assertIn(f'/builds/{self.build.id}/fwd/admin/', content)
         self.assertNotIn('http://localhost:9000/', content)
+        self.assertNotIn('/fwd/builds/', content)
     
-    @patch('builds.views.requests.get')
-    def test_relative_urls_rewritten_in_html(self, mock_get):
+    @patch('builds.views._SESSION.request')
+    def test_relative_urls_rewritten_in_html(self, mock_request):
         """Test that relative URLs are rewritten in HTML responses."""
         html_content = b'''
         <html>
@@ -88,7 +102,7 @@ class ProxyURLRewritingTests(TestCase):
             <img src="/static/logo.png">
         </html>
         '''
-        mock_get.return_value = create_mock_response(content=html_content)
+        mock_request.return_value = create_mock_response(content=html_content)
         
         response = self.client.get(f'/builds/{self.build.id}/fwd/')
         
@@ -97,14 +111,47 @@ class ProxyURLRewritingTests(TestCase):
         self.assertIn(f'/builds/{self.build.id}/fwd/submit/', content)
         self.assertIn(f'/builds/{self.build.id}/fwd/static/logo.png', content)
     
-    @patch('builds.views.requests.get')
-    def test_redirect_location_rewritten(self, mock_get):
+    @patch('builds.views._SESSION.request')
+    def test_xhtml_urls_rewritten(self, mock_request):
+        """Test that XHTML responses are rewritten like HTML, whatever the case of the type."""
+        mock_request.return_value = create_mock_response(
+            content=b'<html><a href="/login/">Login</a></html>',
+            headers={'content-type': 'Application/XHTML+XML; charset=utf-8'}
+        )
+        
+        response = self.client.get(f'/builds/{self.build.id}/fwd/')
+        
+        self.assertIn(f'/builds/{self.build.id}/fwd/login/', response.content.decode('utf-8'))
+    
+    @patch('builds.views._SESSION.request')
+    def test_html_without_urls_returned_unchanged(self, mock_request):
+        """Test that HTML with nothing to rewrite is passed through byte for byte."""
+        html_content = '<html><p>Café <a href="page/">relative</a></p></html>'.encode('latin-1')
+        mock_request.return_value = create_mock_response(content=html_content)
+        
+        response = self.client.get(f'/builds/{self.build.id}/fwd/')
+        
+        self.assertEqual(response.content, html_content)
+    
+    @patch('builds.views._SESSION.request')
+    def test_rewritten_html_keeps_original_bytes(self, mock_request):
+        """Test that rewriting works on the raw bytes, without re-encoding the page."""
+        html_content = '<html><p>Café</p><a href="/login/">Login</a></html>'.encode('latin-1')
+        mock_request.return_value = create_mock_response(content=html_content)
+        
+        response = self.client.get(f'/builds/{self.build.id}/fwd/')
+        
+        expected = html_content.replace(b'href="/', f'href="/builds/{self.build.id}/fwd/'.encode())
+        self.assertEqual(response.content, expected)
+    
+    @patch('builds.views._SESSION.request')
+    def test_redirect_location_rewritten(self, mock_request):
         """Test that redirect Location headers are rewritten."""
         headers = {
             'content-type': 'text/html',
             'location': '/admin/login/'
         }
-        mock_get.return_value = create_mock_response(
+        mock_request.return_value = create_mock_response(
             status_code=302,
             content=b'',
             headers=headers
@@ -114,43 +161,82 @@ class ProxyURLRewritingTests(TestCase):
         
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response['Location'], f'/builds/{self.build.id}/fwd/admin/login/')
+    
+    @patch('builds.views._SESSION.request')
+    def test_redirect_location_rewritten_for_non_html(self, mock_request):
+        """Test that redirects with a non-HTML body are rewritten too."""
+        mock_request.return_value = create_mock_response(
+            status_code=302,
+            content=b'',
+            headers={'content-type': 'text/plain', 'location': '/next/'}
+        )
+        
+        response = self.client.get(f'/builds/{self.build.id}/fwd/')
+        
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], f'/builds/{self.build.id}/fwd/next/')
+    
+    @patch('builds.views._SESSION.request')
+    def test_absolute_redirect_location_rewritten_once(self, mock_request):
+        """Test that an absolute redirect to the container gets the proxy prefix only once."""
+        mock_request.return_value = create_mock_response(
+            status_code=302,
+            content=b'',
+            headers={'content-type': 'text/html', 'location': 'http://127.0.0.1:9000/admin/'}
+        )
+        
+        response = self.client.get(f'/builds/{self.build.id}/fwd/')
+        
+        self.assertEqual(response['Location'], f'/builds/{self.build.id}/fwd/admin/')
+    
+    @patch('builds.views._SESSION.request')
+    def test_non_html_response_streamed(self, mock_request):
+        """Test that non-HTML bodies are streamed through unchanged."""
+        body = b'x' * (200 * 1024)
+        mock_request.return_value = create_mock_response(
+            content=body,
+            headers={'content-type': 'application/octet-stream', 'content-length': str(len(body))}
+        )
+        
+        response = self.client.get(f'/builds/{self.build.id}/fwd/download')
+        
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Length'], str(len(body)))
+        self.assertEqual(b''.join(response.streaming_content), body)
+    
+    @patch('builds.views._SESSION.request')
+    @patch('builds.models.Build.sync_container_status')
+    def test_build_lookup_cached_until_build_saved(self, mock_sync, mock_request):
+        """Test that the build is looked up once per burst and refreshed after a save."""
+        mock_request.return_value = create_mock_response(
+            content=b'ok',
+            headers={'content-type': 'text/plain'}
+        )
+        
+        self.client.get(f'/builds/{self.build.id}/fwd/app.css')
+        self.client.get(f'/builds/{self.build.id}/fwd/app.js')
+        self.assertEqual(mock_sync.call_count, 1)
+        
+        # Saving the build (e.g. container restarted on a new port) drops the cache
+        self.build.host_port = 9001
+        self.build.save()
+        self.client.get(f'/builds/{self.build.id}/fwd/')
+        
+        self.assertEqual(mock_sync.call_count, 2)
+        self.assertEqual(mock_request.call_args[0][1], 'http://127.0.0.1:9001/')
 
 
-class ProxyCookieHandlingTests(TestCase):
+class ProxyCookieHandlingTests(ProxyTestCase):
     """Test that cookies are correctly filtered and handled."""
     
     def setUp(self):
+        super().setUp()
         self.factory = RequestFactory()
-        self.user = User.objects.create_user(username='testuser', password='testpass')
-        
-        self.repo = GitRepository.objects.create(
-            name='test-repo',
-            url='https://github.com/test/repo.git',
-            user=self.user
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            sha='abc123',
-            message='test commit',
-            author='Test Author',
-            author_email='test@example.com',
-            committed_at=datetime.now(timezone.utc)
-        )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
-            branch_name='main',
-            container_port=8000,
-            container_status='running',
-            container_id='test123',
-            host_port=9000,
-            status='success'
-        )
     
-    @patch('builds.views.requests.get')
-    def test_nohands_cookies_filtered_out(self, mock_get):
+    @patch('builds.views._SESSION.request')
+    def test_nohands_cookies_filtered_out(self, mock_request):
         """Test that NoHands cookies are not forwarded to container."""
-        mock_get.return_value = create_mock_response(
+        mock_request.return_value = create_mock_response(
             status_code=200,
             content=b'test',
             headers={'content-type': 'text/plain'}
@@ -168,8 +254,8 @@ class ProxyCookieHandlingTests(TestCase):
         
         response = proxy_to_container(request, self.build.id, '')
         
-        # Check that requests.get was called with filtered cookies
-        call_args = mock_get.call_args
+        # Check that the container request was made with filtered cookies
+        call_args = mock_request.call_args
         headers = call_args[1]['headers']
         
         # NoHands cookies should not be in the forwarded cookies
@@ -178,43 +264,37 @@ class ProxyCookieHandlingTests(TestCase):
             self.assertNotIn('nohands_csrftoken', headers['Cookie'])
             # App cookie should be present
             self.assertIn('sessionid=app789', headers['Cookie'])
+    
+    @patch('builds.views._SESSION.request')
+    def test_nohands_cookies_stripped_anywhere_in_header(self, mock_request):
+        """Test that NoHands cookies are stripped wherever they appear in the header."""
+        mock_request.return_value = create_mock_response(
+            status_code=200,
+            content=b'test',
+            headers={'content-type': 'text/plain'}
+        )
+        
+        request = self.factory.get('/')
+        request.user = self.user
+        request.META['HTTP_COOKIE'] = 'csrftoken=app1; nohands_sessionid=nohands123; sessionid=app789; nohands_csrftoken=csrf456'
+        
+        proxy_to_container(request, self.build.id, '')
+        
+        headers = mock_request.call_args[1]['headers']
+        self.assertEqual(headers['Cookie'], 'csrftoken=app1; sessionid=app789')
 
 
-class ProxyCSRFHeaderTests(TestCase):
+class ProxyCSRFHeaderTests(ProxyTestCase):
     """Test that CSRF headers are correctly set for container."""
     
     def setUp(self):
+        super().setUp()
         self.factory = RequestFactory()
-        self.user = User.objects.create_user(username='testuser', password='testpass')
-        
-        self.repo = GitRepository.objects.create(
-            name='test-repo',
-            url='https://github.com/test/repo.git',
-            user=self.user
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            sha='abc123',
-            message='test commit',
-            author='Test Author',
-            author_email='test@example.com',
-            committed_at=datetime.now(timezone.utc)
-        )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
-            branch_name='main',
-            container_port=8000,
-            container_status='running',
-            container_id='test123',
-            host_port=9000,
-            status='success'
-        )
     
-    @patch('builds.views.requests.post')
-    def test_csrf_headers_set_for_post(self, mock_post):
+    @patch('builds.views._SESSION.request')
+    def test_csrf_headers_set_for_post(self, mock_request):
         """Test that Origin and Referer headers are set for POST requests."""
-        mock_post.return_value = create_mock_response(
+        mock_request.return_value = create_mock_response(
             status_code=200,
             content=b'test',
             headers={'content-type': 'text/plain'}
@@ -226,13 +306,82 @@ class ProxyCSRFHeaderTests(TestCase):
         response = proxy_to_container(request, self.build.id, 'submit/')
         
         # Check headers
-        call_args = mock_post.call_args
+        call_args = mock_request.call_args
         headers = call_args[1]['headers']
         
         self.assertEqual(headers['Host'], f'127.0.0.1:{self.build.host_port}')
         # Le Referer doit inclure le path complet maintenant
         self.assertEqual(headers['Referer'], f'http://127.0.0.1:{self.build.host_port}/submit/')
         self.assertEqual(headers['Origin'], f'http://127.0.0.1:{self.build.host_port}')
+    
+    @patch('builds.views._SESSION.request')
+    def test_request_headers_forwarded(self, mock_request):
+        """Test that request headers are forwarded except Referer and hop-by-hop ones."""
+        mock_request.return_value = create_mock_response(
+            status_code=200,
+            content=b'test',
+            headers={'content-type': 'text/plain'}
+        )
+        
+        request = self.factory.get(
+            '/',
+            HTTP_ACCEPT='text/html',
+            HTTP_X_CSRFTOKEN='token123',
+            HTTP_REFERER='http://nohands.example/builds/',
+            HTTP_X_FORWARDED_FOR='10.0.0.1',
+            HTTP_RANGE='bytes=0-99',
+            HTTP_HX_REQUEST='true',
+            HTTP_CONNECTION='keep-alive'
+        )
+        request.user = self.user
+        
+        proxy_to_container(request, self.build.id, '')
+        
+        headers = mock_request.call_args[1]['headers']
+        self.assertEqual(headers['Accept'], 'text/html')
+        self.assertEqual(headers['X-Csrftoken'], 'token123')
+        self.assertEqual(headers['X-Forwarded-For'], '10.0.0.1')
+        self.assertEqual(headers['Range'], 'bytes=0-99')
+        self.assertEqual(headers['Hx-Request'], 'true')
+        self.assertNotIn('Referer', headers)
+        self.assertNotIn('Connection', headers)
+    
+    @patch('builds.views._SESSION.request')
+    def test_method_and_body_forwarded_through_session(self, mock_request):
+        """Test that the method and body go through the shared session, streamed."""
+        mock_request.return_value = create_mock_response(
+            status_code=200,
+            content=b'ok',
+            headers={'content-type': 'text/plain'}
+        )
+        
+        request = self.factory.put('/', data=b'payload', content_type='text/plain')
+        request.user = self.user
+        
+        proxy_to_container(request, self.build.id, 'item/')
+        
+        args, kwargs = mock_request.call_args
+        self.assertEqual(args, ('PUT', f'http://127.0.0.1:{self.build.host_port}/item/'))
+        self.assertEqual(kwargs['data'], b'payload')
+        self.assertTrue(kwargs['stream'])
+    
+    @patch('builds.views._SESSION.request')
+    def test_multipart_body_forwarded_unchanged(self, mock_request):
+        """Test that a multipart POST is forwarded as raw bytes, boundary included."""
+        mock_request.return_value = create_mock_response(
+            status_code=200,
+            content=b'ok',
+            headers={'content-type': 'text/plain'}
+        )
+        
+        request = self.factory.post('/', data={'name': 'value', 'file': SimpleUploadedFile('a.txt', b'data')})
+        request.user = self.user
+        
+        proxy_to_container(request, self.build.id, 'upload/')
+        
+        kwargs = mock_request.call_args[1]
+        self.assertEqual(kwargs['data'], request.body)
+        self.assertEqual(kwargs['headers']['Content-Type'], request.META['CONTENT_TYPE'])
 
 
 class ContainerStartEnvVarsTests(TestCase):
@@ -279,38 +428,35 @@ class ContainerStartEnvVarsTests(TestCase):
         )
         
         self.assertEqual(container_id, 'container123')
-
-
-class ProxyAuthenticationTests(TestCase):
-    """Test that proxy requires authentication."""
     
-    def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username='testuser', password='testpass')
+    @patch('builds.docker_utils.subprocess.run')
+    def test_many_env_vars_passed_as_env_file(self, mock_run):
+        """Test that many env vars go through one --env-file, removed afterwards."""
+        env_file_contents = {}
         
-        self.repo = GitRepository.objects.create(
-            name='test-repo',
-            url='https://github.com/test/repo.git',
-            user=self.user
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            sha='abc123',
-            message='test commit',
-            author='Test Author',
-            author_email='test@example.com',
-            committed_at=datetime.now(timezone.utc)
-        )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
-            branch_name='main',
-            container_port=8000,
-            container_status='running',
-            container_id='test123',
-            host_port=9000,
-            status='success'
+        def fake_run(cmd, **kwargs):
+            path = cmd[cmd.index('--env-file') + 1]
+            with open(path) as f:
+                env_file_contents['text'] = f.read()
+            env_file_contents['path'] = path
+            return Mock(returncode=0, stdout="container123\n", stderr="")
+        
+        mock_run.side_effect = fake_run
+        env_vars = {f'VAR_{i}': f'value{i}' for i in range(6)}
+        
+        start_container(image_tag='test:latest', container_port=8000, env_vars=env_vars)
+        
+        call_args = mock_run.call_args[0][0]
+        self.assertNotIn('-e', call_args)
+        self.assertEqual(
+            env_file_contents['text'],
+            ''.join(f'VAR_{i}=value{i}\n' for i in range(6))
         )
+        self.assertFalse(os.path.exists(env_file_contents['path']))
+
+
+class ProxyAuthenticationTests(ProxyTestCase):
+    """Test that proxy requires authentication."""
     
     def test_proxy_requires_login(self):
         """Test that unauthenticated users are redirected to login."""
@@ -320,16 +466,16 @@ class ProxyAuthenticationTests(TestCase):
         self.assertEqual(response.status_code, 302)
         self.assertIn('/accounts/github/login/', response.url)
     
-    @patch('builds.views.requests.get')
-    def test_authenticated_user_can_access_proxy(self, mock_get):
+    @patch('builds.views._SESSION.request')
+    def test_authenticated_user_can_access_proxy(self, mock_request):
         """Test that authenticated users can access the proxy."""
-        mock_get.return_value = create_mock_response(
+        mock_request.return_value = create_mock_response(
             status_code=200,
             content=b'test',
             headers={'content-type': 'text/plain'}
         )
         
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         response = self.client.get(f'/builds/{self.build.id}/fwd/')
         
         self.assertEqual(response.status_code, 200)
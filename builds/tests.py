@@ -1,40 +1,52 @@
-from django.test import TestCase, Client
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.utils import timezone
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
 from .models import Build
 from projects.models import GitRepository, Branch, Commit
-from .dagger_pipeline import BuildResult
+from . import dagger_pipeline, docker_utils, views
+from .dagger_pipeline import BuildResult, run_build_sync
+
+# Commit timestamp shared by the test fixtures
+_COMMITTED_AT = timezone.now()
+
+
+def _view_request(url, user):
+    """
+    GET request for calling a view directly, e.g. to check its template.
+    
+    Skips the test client's middleware, session and auth round-trip.
+    """
+    request = RequestFactory().get(url)
+    request.user = user
+    return request
 
 
 class BuildModelTest(TestCase):
     """Tests for Build model."""
     
-    def setUp(self):
-        self.repo = GitRepository.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
-            name="main",
-            commit_sha="abc123"
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
+        cls.build = Build.objects.create(
+            repository=cls.repo,
+            commit=cls.commit,
             branch_name="main",
             status="pending"
         )
@@ -55,17 +67,13 @@ class BuildModelTest(TestCase):
     
     def test_build_status_choices(self):
         """Test build status choices."""
-        self.build.status = 'running'
-        self.build.save()
-        self.assertEqual(self.build.status, 'running')
+        # Validate the status field alone: full_clean() would also query the FKs
+        status_field = Build._meta.get_field('status')
+        for status in ('running', 'success', 'failed'):
+            status_field.validate(status, self.build)
         
-        self.build.status = 'success'
-        self.build.save()
-        self.assertEqual(self.build.status, 'success')
-        
-        self.build.status = 'failed'
-        self.build.save()
-        self.assertEqual(self.build.status, 'failed')
+        with self.assertRaises(ValidationError):
+            status_field.validate('not-a-status', self.build)
     
     def test_build_duration_property(self):
         """Test duration property calculation."""
@@ -75,38 +83,39 @@ class BuildModelTest(TestCase):
         # With duration
         self.build.started_at = timezone.now()
         self.build.completed_at = self.build.started_at + timezone.timedelta(minutes=5, seconds=30)
-        self.build.save()
         self.assertEqual(self.build.duration, "5m 30s")
 
 
 class BuildListViewTest(TestCase):
     """Tests for build list view."""
     
-    def setUp(self):
-        self.client = Client()
-        self.url = reverse('build_list')
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse('build_list')
         
-        # Create and login a test user
-        self.user = User.objects.create_user(
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123",
             message="Test",
             author="Test",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
     
+    def setUp(self):
+        self.client.force_login(self.user)
+    
     def test_view_url_accessible(self):
         """Test that the view is accessible."""
         response = self.client.get(self.url)
@@ -114,111 +123,124 @@ class BuildListViewTest(TestCase):
     
     def test_view_uses_correct_template(self):
         """Test that correct template is used."""
-        response = self.client.get(self.url)
-        self.assertTemplateUsed(response, 'builds/build_list.html')
+        with self.assertTemplateUsed('builds/build_list.html'):
+            views.build_list(_view_request(self.url, self.user))
     
     def test_view_shows_builds(self):
         """Test that builds are displayed."""
-        build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
-            branch_name="main",
-            status="success"
-        )
-        response = self.client.get(self.url)
-        self.assertContains(response, "test-repo")
-        self.assertContains(response, "success")
+        Build.objects.bulk_create([
+            Build(
+                repository=self.repo,
+                commit=self.commit,
+                branch_name=f"branch-{i}",
+                status="success"
+            )
+            for i in range(10)
+        ])
+        # Middleware host/setup checks (3), session, user, then one query
+        # for the builds with their repository and commit joined in,
+        # however many rows are listed
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        for text in ("test-repo", "success"):
+            self.assertIn(text, content)
 
 
 class BuildDetailViewTest(TestCase):
     """Tests for build detail view."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
+        cls.build = Build.objects.create(
+            repository=cls.repo,
+            commit=cls.commit,
             branch_name="main",
             status="success",
             logs="Build successful",
             image_tag="test-repo:abc123de"
         )
-        self.url = reverse('build_detail', args=[self.build.id])
+        cls.url = reverse('build_detail', args=[cls.build.id])
+    
+    def setUp(self):
+        self.client.force_login(self.user)
     
     def test_view_url_accessible(self):
         """Test that the view is accessible."""
-        response = self.client.get(self.url)
+        # Middleware host/setup checks (3), session, user, then one query
+        # for the build with its repository and commit joined in
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
     
     def test_view_uses_correct_template(self):
         """Test that correct template is used."""
-        response = self.client.get(self.url)
-        self.assertTemplateUsed(response, 'builds/build_detail.html')
+        with self.assertTemplateUsed('builds/build_detail.html'):
+            views.build_detail(_view_request(self.url, self.user), build_id=self.build.id)
     
     def test_view_shows_build_info(self):
         """Test that build info is displayed."""
         response = self.client.get(self.url)
-        self.assertContains(response, "test-repo")
-        self.assertContains(response, "abc123de")
-        self.assertContains(response, "success")
-        self.assertContains(response, "Build successful")
-        self.assertContains(response, "test-repo:abc123de")
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        for text in ("test-repo", "abc123de", "success", "Build successful", "test-repo:abc123de"):
+            self.assertIn(text, content)
 
 
 class BuildCreateViewTest(TestCase):
     """Tests for build create view."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
+        cls.branch = Branch.objects.create(
+            repository=cls.repo,
             name="main",
             commit_sha="abc123"
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
+            branch=cls.branch,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
-        self.url = reverse('build_create', args=[self.repo.id, self.commit.id])
+        cls.url = reverse('build_create', args=[cls.repo.id, cls.commit.id])
+    
+    def setUp(self):
+        self.client.force_login(self.user)
     
     def test_view_url_accessible_get(self):
         """Test that the view is accessible via GET."""
@@ -227,8 +249,12 @@ class BuildCreateViewTest(TestCase):
     
     def test_view_uses_correct_template(self):
         """Test that correct template is used."""
-        response = self.client.get(self.url)
-        self.assertTemplateUsed(response, 'builds/build_create.html')
+        with self.assertTemplateUsed('builds/build_create.html'):
+            views.build_create(
+                _view_request(self.url, self.user),
+                repo_id=self.repo.id,
+                commit_id=self.commit.id
+            )
     
     @patch('builds.views.threading.Thread')
     def test_create_build_post(self, mock_thread):
@@ -250,7 +276,7 @@ class BuildCreateViewTest(TestCase):
         mock_thread.assert_called_once()
 
 
-class BuildResultTest(TestCase):
+class BuildResultTest(SimpleTestCase):
     """Tests for BuildResult class."""
     
     def test_build_result_creation(self):
@@ -285,14 +311,17 @@ class BuildResultTest(TestCase):
         self.assertEqual(result_dict['duration'], 120.5)
 
 
-class DaggerPipelineTest(TestCase):
+class DaggerPipelineTest(SimpleTestCase):
     """Tests for Dagger pipeline functions."""
     
-    @patch('builds.dagger_pipeline.asyncio.run')
-    def test_run_build_sync(self, mock_asyncio_run):
+    def setUp(self):
+        # Swap asyncio.run directly (restored on cleanup) rather than via @patch
+        self.mock_asyncio_run = MagicMock()
+        self.addCleanup(setattr, dagger_pipeline.asyncio, 'run', dagger_pipeline.asyncio.run)
+        dagger_pipeline.asyncio.run = self.mock_asyncio_run
+    
+    def test_run_build_sync(self):
         """Test synchronous build wrapper."""
-        from builds.dagger_pipeline import run_build_sync, BuildResult
-        
         # Mock the async function result
         mock_result = BuildResult(
             status='success',
@@ -300,7 +329,7 @@ class DaggerPipelineTest(TestCase):
             logs='Build completed',
             duration=60.0
         )
-        mock_asyncio_run.return_value = mock_result
+        self.mock_asyncio_run.return_value = mock_result
         
         result = run_build_sync(
             source_dir=Path('/tmp/test'),
@@ -311,76 +340,64 @@ class DaggerPipelineTest(TestCase):
         
         self.assertEqual(result.status, 'success')
         self.assertEqual(result.image_tag, 'test:abc123')
-        mock_asyncio_run.assert_called_once()
+        self.mock_asyncio_run.assert_called_once()
 
 
-class URLRoutingTest(TestCase):
+class URLRoutingTest(SimpleTestCase):
     """Tests for URL routing."""
     
-    def test_build_list_url_resolves(self):
-        """Test build list URL resolves correctly."""
-        url = reverse('build_list')
-        self.assertEqual(url, '/builds/')
-    
-    def test_container_list_url_resolves(self):
-        """Test container list URL resolves correctly."""
-        url = reverse('container_list')
-        self.assertEqual(url, '/builds/containers/')
-    
-    def test_build_detail_url_resolves(self):
-        """Test build detail URL resolves correctly."""
-        url = reverse('build_detail', args=[1])
-        self.assertEqual(url, '/builds/1/')
-    
-    def test_build_create_url_resolves(self):
-        """Test build create URL resolves correctly."""
-        url = reverse('build_create', args=[1, 1])
-        self.assertEqual(url, '/builds/create/1/1/')
-    
-    def test_start_container_url_resolves(self):
-        """Test start container URL resolves correctly."""
-        url = reverse('start_build_container', args=[1])
-        self.assertEqual(url, '/builds/1/start-container/')
-    
-    def test_stop_container_url_resolves(self):
-        """Test stop container URL resolves correctly."""
-        url = reverse('stop_build_container', args=[1])
-        self.assertEqual(url, '/builds/1/stop-container/')
-    
-    def test_container_logs_url_resolves(self):
-        """Test container logs URL resolves correctly."""
-        url = reverse('container_logs', args=[1])
-        self.assertEqual(url, '/builds/1/container-logs/')
+    # (URL name, args, expected path)
+    ROUTES = [
+        ('build_list', [], '/builds/'),
+        ('container_list', [], '/builds/containers/'),
+        ('build_detail', [1], '/builds/1/'),
+        ('build_create', [1, 1], '/builds/create/1/1/'),
+        ('start_build_container', [1], '/builds/1/start-container/'),
+        ('stop_build_container', [1], '/builds/1/stop-container/'),
+        ('container_logs', [1], '/builds/1/container-logs/'),
+        ('list_commit_files', [1, 1], '/builds/api/files/1/1/'),
+        ('get_commit_file_content', [1, 1], '/builds/api/file-content/1/1/'),
+        ('get_dockerfile_template', ['Python'], '/builds/api/templates/Python/'),
+        ('get_env_template', ['Python'], '/builds/api/env-templates/Python/'),
+    ]
+    
+    def test_urls_resolve(self):
+        """Test build URLs resolve correctly."""
+        for name, args, expected in self.ROUTES:
+            with self.subTest(name=name):
+                self.assertEqual(reverse(name, args=args), expected)
 
 
 class ContainerListViewTest(TestCase):
     """Tests for container list view."""
     
-    def setUp(self):
-        self.client = Client()
-        self.url = reverse('container_list')
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse('container_list')
         
-        # Create and login a test user
-        self.user = User.objects.create_user(
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123",
             message="Test",
             author="Test",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
     
+    def setUp(self):
+        self.client.force_login(self.user)
+    
     def test_view_url_accessible(self):
         """Test that the view is accessible."""
         response = self.client.get(self.url)
@@ -388,29 +405,36 @@ class ContainerListViewTest(TestCase):
     
     def test_view_uses_correct_template(self):
         """Test that correct template is used."""
-        response = self.client.get(self.url)
-        self.assertTemplateUsed(response, 'builds/container_list.html')
+        with self.assertTemplateUsed('builds/container_list.html'):
+            views.container_list(_view_request(self.url, self.user))
     
     def test_view_shows_successful_builds(self):
         """Test that only successful builds are displayed."""
-        # Create a successful build
-        success_build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
-            branch_name="main",
-            status="success",
-            image_tag="test:abc123"
-        )
-        # Create a failed build (should not appear)
-        Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
-            branch_name="main",
-            status="failed"
-        )
-        response = self.client.get(self.url)
-        self.assertContains(response, "test-repo")
-        self.assertContains(response, "test:abc123")
+        Build.objects.bulk_create([
+            # A successful build
+            Build(
+                repository=self.repo,
+                commit=self.commit,
+                branch_name="main",
+                status="success",
+                image_tag="test:abc123"
+            ),
+            # A failed build (should not appear)
+            Build(
+                repository=self.repo,
+                commit=self.commit,
+                branch_name="main",
+                status="failed"
+            ),
+        ])
+        # Middleware host/setup checks (3), session, user, then one query
+        # for the builds with their repository and commit joined in
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        for text in ("test-repo", "test:abc123"):
+            self.assertIn(text, content)
     
     def test_view_shows_running_container_status(self):
         """Test that running container status is displayed."""
@@ -424,8 +448,10 @@ class ContainerListViewTest(TestCase):
             container_id="abc123container"
         )
         response = self.client.get(self.url)
-        self.assertContains(response, "Running")
-        self.assertContains(response, "8080")
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        for text in ("Running", "8080"):
+            self.assertIn(text, content)
     
     def test_view_shows_stopped_container_status(self):
         """Test that stopped container status is displayed."""
@@ -454,29 +480,24 @@ class ContainerListViewTest(TestCase):
 class BuildModelExtendedTest(TestCase):
     """Extended tests for Build model with container fields."""
     
-    def setUp(self):
-        self.repo = GitRepository.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
-            name="main",
-            commit_sha="abc123"
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
     
     def test_container_fields_default(self):
         """Test container fields have correct defaults."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -489,7 +510,7 @@ class BuildModelExtendedTest(TestCase):
     
     def test_container_url_property_running(self):
         """Test container_url property when container is running."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -501,7 +522,7 @@ class BuildModelExtendedTest(TestCase):
     
     def test_container_url_property_not_running(self):
         """Test container_url property when container is not running."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -514,47 +535,44 @@ class BuildModelExtendedTest(TestCase):
 class ContainerViewsTest(TestCase):
     """Tests for container control views."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
-            name="main",
-            commit_sha="abc123"
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
+        cls.build = Build.objects.create(
+            repository=cls.repo,
+            commit=cls.commit,
             branch_name="main",
             status="success",
             image_tag="test-repo:abc123de"
         )
+        cls.start_url = reverse('start_build_container', args=[cls.build.id])
+        cls.stop_url = reverse('stop_build_container', args=[cls.build.id])
+        cls.logs_url = reverse('container_logs', args=[cls.build.id])
+    
+    def setUp(self):
+        self.client.force_login(self.user)
     
     def test_start_container_get_redirects(self):
         """Test that GET request redirects to build detail."""
-        url = reverse('start_build_container', args=[self.build.id])
-        response = self.client.get(url)
+        response = self.client.get(self.start_url)
         self.assertEqual(response.status_code, 302)
     
     def test_start_container_failed_build(self):
@@ -562,30 +580,28 @@ class ContainerViewsTest(TestCase):
         self.build.status = 'failed'
         self.build.save()
         
-        url = reverse('start_build_container', args=[self.build.id])
-        response = self.client.post(url)
+        response = self.client.post(self.start_url)
         self.assertEqual(response.status_code, 302)
         
         # Verify container status unchanged
-        self.build.refresh_from_db()
+        self.build.refresh_from_db(fields=['container_status'])
         self.assertEqual(self.build.container_status, 'none')
     
     def test_stop_container_get_redirects(self):
         """Test that GET request redirects to build detail."""
-        url = reverse('stop_build_container', args=[self.build.id])
-        response = self.client.get(url)
+        response = self.client.get(self.stop_url)
         self.assertEqual(response.status_code, 302)
     
     def test_stop_container_no_container(self):
         """Test stopping when no container is running."""
-        url = reverse('stop_build_container', args=[self.build.id])
-        response = self.client.post(url)
+        response = self.client.post(self.stop_url)
         self.assertEqual(response.status_code, 302)
     
     def test_container_logs_no_container(self):
         """Test getting logs when no container is running."""
-        url = reverse('container_logs', args=[self.build.id])
-        response = self.client.get(url)
+        # Middleware host/setup checks (3), session, user, then the build
+        with self.assertNumQueries(6):
+            response = self.client.get(self.logs_url)
         self.assertEqual(response.status_code, 200)
         
         data = response.json()
@@ -593,9 +609,16 @@ class ContainerViewsTest(TestCase):
         self.assertEqual(data['error'], 'No container running')
 
 
-class DockerUtilsTest(TestCase):
+class DockerUtilsTest(SimpleTestCase):
     """Tests for Docker utilities."""
     
+    def setUp(self):
+        # Swap subprocess.run directly (restored on cleanup) rather than
+        # going through @patch for every test
+        self.mock_run = MagicMock()
+        self.addCleanup(setattr, docker_utils.subprocess, 'run', docker_utils.subprocess.run)
+        docker_utils.subprocess.run = self.mock_run
+    
     def test_find_available_port(self):
         """Test finding an available port."""
         from builds.docker_utils import find_available_port
@@ -605,12 +628,11 @@ class DockerUtilsTest(TestCase):
         self.assertGreaterEqual(port, 49000)
         self.assertLess(port, 49100)
     
-    @patch('builds.docker_utils.subprocess.run')
-    def test_get_container_logs(self, mock_run):
+    def test_get_container_logs(self):
         """Test getting container logs."""
         from builds.docker_utils import get_container_logs
         
-        mock_run.return_value = MagicMock(
+        self.mock_run.return_value = SimpleNamespace(
             returncode=0,
             stdout="Log line 1\nLog line 2",
             stderr=""
@@ -618,29 +640,29 @@ class DockerUtilsTest(TestCase):
         
         logs = get_container_logs("abc123", tail=100)
         self.assertIn("Log line 1", logs)
-        mock_run.assert_called_once()
+        self.mock_run.assert_called_once()
     
-    @patch('builds.docker_utils.subprocess.run')
-    def test_get_container_status(self, mock_run):
+    def test_get_container_status(self):
         """Test getting container status."""
         from builds.docker_utils import get_container_status
         
-        mock_run.return_value = MagicMock(
+        self.mock_run.return_value = SimpleNamespace(
             returncode=0,
-            stdout="running\n"
+            stdout="running\n",
+            stderr=""
         )
         
         status = get_container_status("abc123")
         self.assertEqual(status, "running")
     
-    @patch('builds.docker_utils.subprocess.run')
-    def test_start_container_success(self, mock_run):
+    def test_start_container_success(self):
         """Test starting a container."""
         from builds.docker_utils import start_container
         
-        mock_run.return_value = MagicMock(
+        self.mock_run.return_value = SimpleNamespace(
             returncode=0,
-            stdout="abc123def456\n"
+            stdout="abc123def456\n",
+            stderr=""
         )
         
         container_id, host_port = start_container(
@@ -652,14 +674,84 @@ class DockerUtilsTest(TestCase):
         self.assertEqual(container_id, "abc123def456")
         self.assertEqual(host_port, 9000)
     
-    @patch('builds.docker_utils.subprocess.run')
-    def test_stop_container_success(self, mock_run):
+    @override_settings(DOCKER_USE_SDK=True)
+    @patch('builds.docker_utils._get_docker_client')
+    def test_start_container_with_sdk(self, mock_client):
+        """Test starting a container through the Docker Engine API."""
+        from builds.docker_utils import start_container
+        
+        client = mock_client.return_value
+        client.create_container.return_value = {'Id': 'abc123def456'}
+        client.port.return_value = [{'HostIp': '0.0.0.0', 'HostPort': '32768'}]
+        
+        container_id, host_port = start_container(
+            image_tag="test:latest",
+            container_port=8080,
+            env_vars={'API_KEY': 'secret'}
+        )
+        
+        self.assertEqual(container_id, "abc123def456")
+        self.assertEqual(host_port, 32768)
+        create_kwargs = client.create_container.call_args[1]
+        self.assertEqual(create_kwargs['environment'], {'API_KEY': 'secret'})
+        self.assertEqual(create_kwargs['ports'], [8080])
+        client.create_host_config.assert_called_once_with(port_bindings={8080: None})
+        client.start.assert_called_once_with(container='abc123def456')
+        self.mock_run.assert_not_called()
+    
+    @override_settings(DOCKER_USE_SDK=True)
+    @patch('builds.docker_utils._get_docker_client')
+    def test_start_container_with_sdk_no_port_binding(self, mock_client):
+        """Test that a container without a host port binding is removed."""
+        from builds.docker_utils import start_container, DockerError
+        
+        client = mock_client.return_value
+        client.create_container.return_value = {'Id': 'abc123def456'}
+        client.port.return_value = None
+        
+        with self.assertRaisesMessage(DockerError, "no host port binding for 8080"):
+            start_container(image_tag="test:latest", container_port=8080)
+        
+        client.remove_container.assert_called_once_with('abc123def456', force=True)
+    
+    @override_settings(DOCKER_USE_SDK=True)
+    @patch('builds.docker_utils._get_docker_client')
+    def test_start_container_with_sdk_start_failure(self, mock_client):
+        """Test that a container failing to start is removed."""
+        import docker
+        from builds.docker_utils import start_container, DockerError
+        
+        client = mock_client.return_value
+        client.create_container.return_value = {'Id': 'abc123def456'}
+        
+        cases = [
+            (None, "Failed to start container"),
+            (9000, "Port 9000 is already in use"),
+        ]
+        for host_port, message in cases:
+            with self.subTest(host_port=host_port):
+                client.remove_container.reset_mock()
+                client.start.side_effect = docker.errors.APIError(
+                    "Bind for 0.0.0.0:9000 failed: port is already allocated"
+                )
+                
+                with self.assertRaisesMessage(DockerError, message):
+                    start_container(
+                        image_tag="test:latest",
+                        container_port=8080,
+                        host_port=host_port
+                    )
+                
+                client.remove_container.assert_called_once_with('abc123def456', force=True)
+    
+    def test_stop_container_success(self):
         """Test stopping a container."""
         from builds.docker_utils import stop_container
         
-        mock_run.return_value = MagicMock(
+        self.mock_run.return_value = SimpleNamespace(
             returncode=0,
-            stdout="abc123\n"
+            stdout="abc123\n",
+            stderr=""
         )
         
         result = stop_container("abc123")
@@ -669,39 +761,40 @@ class DockerUtilsTest(TestCase):
 class DockerfileConfigurationTest(TestCase):
     """Tests for Dockerfile configuration functionality."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
+        cls.branch = Branch.objects.create(
+            repository=cls.repo,
             name="main",
             commit_sha="abc123"
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
+            branch=cls.branch,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
     
+    def setUp(self):
+        self.client.force_login(self.user)
+    
     def test_build_dockerfile_fields_default(self):
         """Test that Dockerfile fields have correct defaults."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -764,39 +857,30 @@ class DockerfileConfigurationTest(TestCase):
 class FileListAPITest(TestCase):
     """Tests for file listing API."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
     
-    def test_list_files_url_resolves(self):
-        """Test list files URL resolves correctly."""
-        url = reverse('list_commit_files', args=[1, 1])
-        self.assertEqual(url, '/builds/api/files/1/1/')
-    
-    def test_get_file_content_url_resolves(self):
-        """Test get file content URL resolves correctly."""
-        url = reverse('get_commit_file_content', args=[1, 1])
-        self.assertEqual(url, '/builds/api/file-content/1/1/')
+    def setUp(self):
+        self.client.force_login(self.user)
     
     def test_get_file_content_missing_path(self):
         """Test get file content returns error when path is missing."""
@@ -813,14 +897,12 @@ class DockerfileTemplatesTest(TestCase):
     """Tests for Dockerfile templates functionality."""
     
     def setUp(self):
-        self.client = Client()
-        
         # Create and login a test user
         self.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
     
     def test_get_dockerfile_templates(self):
         """Test that templates are loaded from the templates directory."""
@@ -839,6 +921,10 @@ class DockerfileTemplatesTest(TestCase):
         self.assertIn('Node.js', templates)
         self.assertIn('React', templates)
         self.assertIn('Go', templates)
+        
+        # The cached mapping is shared, so it must be read-only
+        with self.assertRaises(TypeError):
+            templates['Python'] = ''
     
     def test_get_template_choices(self):
         """Test that template choices are generated correctly."""
@@ -865,11 +951,6 @@ class DockerfileTemplatesTest(TestCase):
         # Should contain Python-related content
         self.assertIn('python', default.lower())
     
-    def test_template_api_url_resolves(self):
-        """Test template API URL resolves correctly."""
-        url = reverse('get_dockerfile_template', args=['Python'])
-        self.assertEqual(url, '/builds/api/templates/Python/')
-    
     def test_template_api_returns_content(self):
         """Test template API returns template content."""
         url = reverse('get_dockerfile_template', args=['Python'])
@@ -891,52 +972,34 @@ class DockerfileTemplatesTest(TestCase):
         self.assertFalse(data['success'])
         self.assertIn('not found', data['error'])
     
-    def test_django_template_content(self):
-        """Test Django template has correct content."""
-        from builds.models import get_dockerfile_templates
-        
-        templates = get_dockerfile_templates()
-        django_template = templates.get('Django', '')
-        
-        # Vérifier que le template contient les éléments essentiels
-        self.assertIn('django', django_template.lower())
-        self.assertIn('runserver', django_template.lower())  # Utilise runserver pour dev
-        self.assertIn('configure_csrf', django_template.lower())  # Script de configuration CSRF
-        self.assertIn('entrypoint.sh', django_template.lower())  # Utilise un entrypoint
-    
-    def test_flask_template_content(self):
-        """Test Flask template has correct content."""
-        from builds.models import get_dockerfile_templates
-        
-        templates = get_dockerfile_templates()
-        flask_template = templates.get('Flask', '')
-        
-        self.assertIn('flask', flask_template.lower())
-        self.assertIn('gunicorn', flask_template.lower())
-    
-    def test_nodejs_template_content(self):
-        """Test Node.js template has correct content."""
+    def test_template_content(self):
+        """Test Django, Flask and Node.js templates have correct content."""
         from builds.models import get_dockerfile_templates
         
         templates = get_dockerfile_templates()
-        nodejs_template = templates.get('Node.js', '')
-        
-        self.assertIn('node', nodejs_template.lower())
-        self.assertIn('npm', nodejs_template.lower())
+        expected = {
+            # Django: runserver pour le dev, script de configuration CSRF et entrypoint
+            'Django': ('django', 'runserver', 'configure_csrf', 'entrypoint.sh'),
+            'Flask': ('flask', 'gunicorn'),
+            'Node.js': ('node', 'npm'),
+        }
+        for name, needles in expected.items():
+            template = templates.get(name, '').lower()
+            for needle in needles:
+                with self.subTest(template=name, needle=needle):
+                    self.assertIn(needle, template)
 
 
 class EnvTemplatesTest(TestCase):
     """Tests for .env templates functionality."""
     
     def setUp(self):
-        self.client = Client()
-        
         # Create and login a test user
         self.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
     
     def test_get_env_templates(self):
         """Test that .env templates are loaded from the templates directory."""
@@ -965,11 +1028,6 @@ class EnvTemplatesTest(TestCase):
         # Should contain some content
         self.assertGreater(len(default.strip()), 0)
     
-    def test_env_template_api_url_resolves(self):
-        """Test .env template API URL resolves correctly."""
-        url = reverse('get_env_template', args=['Python'])
-        self.assertEqual(url, '/builds/api/env-templates/Python/')
-    
     def test_env_template_api_returns_content(self):
         """Test .env template API returns template content."""
         url = reverse('get_env_template', args=['Django'])
@@ -1024,39 +1082,40 @@ class EnvTemplatesTest(TestCase):
 class BuildEnvContentTest(TestCase):
     """Tests for Build model env_content field."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
+        cls.branch = Branch.objects.create(
+            repository=cls.repo,
             name="main",
             commit_sha="abc123"
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
+            branch=cls.branch,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
     
+    def setUp(self):
+        self.client.force_login(self.user)
+    
     def test_build_env_content_field_default(self):
         """Test that env_content field has correct default."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -1100,39 +1159,40 @@ class BuildEnvContentTest(TestCase):
 class PortMappingTest(TestCase):
     """Tests for container port mapping functionality."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
+        cls.branch = Branch.objects.create(
+            repository=cls.repo,
             name="main",
             commit_sha="abc123"
         )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
+            branch=cls.branch,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
     
+    def setUp(self):
+        self.client.force_login(self.user)
+    
     def test_container_url_with_custom_port(self):
         """Test container URL is generated correctly with custom port."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -1145,7 +1205,7 @@ class PortMappingTest(TestCase):
     
     def test_container_url_with_default_port(self):
         """Test container URL with default container port."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -1158,7 +1218,7 @@ class PortMappingTest(TestCase):
     
     def test_container_url_no_host_port(self):
         """Test container URL is empty when no host port assigned."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -1170,7 +1230,7 @@ class PortMappingTest(TestCase):
     
     def test_port_mapping_different_ports(self):
         """Test port mapping with container port different from host port."""
-        build = Build.objects.create(
+        build = Build(
             repository=self.repo,
             commit=self.commit,
             branch_name="main",
@@ -1201,18 +1261,24 @@ class PortMappingTest(TestCase):
         self.assertEqual(build.container_port, 3000)
 
 
-class DockerUtilsExtendedTest(TestCase):
+class DockerUtilsExtendedTest(SimpleTestCase):
     """Extended tests for Docker utilities."""
     
-    @patch('builds.docker_utils.subprocess.run')
-    def test_start_container_port_retry(self, mock_run):
+    def setUp(self):
+        # Swap subprocess.run directly (restored on cleanup) rather than
+        # going through @patch for every test
+        self.mock_run = MagicMock()
+        self.addCleanup(setattr, docker_utils.subprocess, 'run', docker_utils.subprocess.run)
+        docker_utils.subprocess.run = self.mock_run
+    
+    def test_start_container_port_retry(self):
         """Test container start retries on port conflict."""
         from builds.docker_utils import start_container
         
         # First call fails with port conflict, second succeeds
-        mock_run.side_effect = [
-            MagicMock(returncode=1, stderr="port is already allocated"),
-            MagicMock(returncode=0, stdout="container123\n")
+        self.mock_run.side_effect = [
+            SimpleNamespace(returncode=1, stdout="", stderr="port is already allocated"),
+            SimpleNamespace(returncode=0, stdout="container123\n", stderr="")
         ]
         
         container_id, host_port = start_container(
@@ -1223,15 +1289,15 @@ class DockerUtilsExtendedTest(TestCase):
         
         self.assertEqual(container_id, "container123")
         # Should have been called twice due to retry
-        self.assertEqual(mock_run.call_count, 2)
+        self.assertEqual(self.mock_run.call_count, 2)
     
-    @patch('builds.docker_utils.subprocess.run')
-    def test_start_container_docker_error(self, mock_run):
+    def test_start_container_docker_error(self):
         """Test container start handles Docker errors."""
         from builds.docker_utils import start_container, DockerError
         
-        mock_run.return_value = MagicMock(
+        self.mock_run.return_value = SimpleNamespace(
             returncode=1,
+            stdout="",
             stderr="Image not found"
         )
         
@@ -1244,31 +1310,31 @@ class DockerUtilsExtendedTest(TestCase):
         
         self.assertIn("Failed to start container", str(context.exception))
     
-    @patch('builds.docker_utils.subprocess.run')
-    def test_remove_container_success(self, mock_run):
+    def test_remove_container_success(self):
         """Test removing a container."""
         from builds.docker_utils import remove_container
         
-        mock_run.return_value = MagicMock(
+        self.mock_run.return_value = SimpleNamespace(
             returncode=0,
-            stdout="abc123\n"
+            stdout="abc123\n",
+            stderr=""
         )
         
         result = remove_container("abc123", force=True)
         self.assertTrue(result)
         
         # Verify force flag was passed
-        call_args = mock_run.call_args[0][0]
+        call_args = self.mock_run.call_args[0][0]
         self.assertIn('-f', call_args)
     
-    @patch('builds.docker_utils.subprocess.run')
-    def test_load_image_from_tar(self, mock_run):
+    def test_load_image_from_tar(self):
         """Test loading Docker image from tar file."""
         from builds.docker_utils import load_image_from_tar
         
-        mock_run.return_value = MagicMock(
+        self.mock_run.return_value = SimpleNamespace(
             returncode=0,
-            stdout="Loaded image: myapp:v1.0\n"
+            stdout="Loaded image: myapp:v1.0\n",
+            stderr=""
         )
         
         image_tag = load_image_from_tar("/tmp/test.tar")
@@ -1288,43 +1354,47 @@ class DockerUtilsExtendedTest(TestCase):
             find_available_port(start_port=49000, max_attempts=5)
         
         self.assertIn("No available port found", str(context.exception))
+    
+    @patch('builds.docker_utils.socket.socket')
+    def test_find_available_port_lets_kernel_choose(self, mock_socket):
+        """Test that without a start port a single bind to port 0 is used."""
+        from builds.docker_utils import find_available_port
+        
+        mock_sock_instance = MagicMock()
+        mock_sock_instance.getsockname.return_value = ('127.0.0.1', 54321)
+        mock_socket.return_value.__enter__.return_value = mock_sock_instance
+        
+        self.assertEqual(find_available_port(), 54321)
+        mock_sock_instance.bind.assert_called_once_with(('localhost', 0))
 
 
 class ContainerLogsAPITest(TestCase):
     """Tests for container logs API."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
-            name="main",
-            commit_sha="abc123"
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
+        cls.build = Build.objects.create(
+            repository=cls.repo,
+            commit=cls.commit,
             branch_name="main",
             status="success",
             image_tag="test-repo:abc123de",
@@ -1332,16 +1402,26 @@ class ContainerLogsAPITest(TestCase):
             container_status="running",
             host_port=32768
         )
+        cls.logs_url = reverse('container_logs', args=[cls.build.id])
     
-    @patch('builds.views.get_container_logs')
-    @patch('builds.views.get_container_status')
-    def test_get_logs_success(self, mock_status, mock_logs):
+    def setUp(self):
+        self.client.force_login(self.user)
+        
+        # Swap the Docker helpers used by the view directly (restored on
+        # cleanup) rather than via @patch on every test
+        self.mock_logs = MagicMock()
+        self.mock_status = MagicMock()
+        self.addCleanup(setattr, views, 'get_container_logs', views.get_container_logs)
+        self.addCleanup(setattr, views, 'get_container_status', views.get_container_status)
+        views.get_container_logs = self.mock_logs
+        views.get_container_status = self.mock_status
+    
+    def test_get_logs_success(self):
         """Test getting container logs successfully."""
-        mock_logs.return_value = "2025-01-01T00:00:00 Log line 1\n2025-01-01T00:00:01 Log line 2"
-        mock_status.return_value = "running"
+        self.mock_logs.return_value = "2025-01-01T00:00:00 Log line 1\n2025-01-01T00:00:01 Log line 2"
+        self.mock_status.return_value = "running"
         
-        url = reverse('container_logs', args=[self.build.id])
-        response = self.client.get(url)
+        response = self.client.get(self.logs_url)
         
         self.assertEqual(response.status_code, 200)
         data = response.json()
@@ -1349,50 +1429,41 @@ class ContainerLogsAPITest(TestCase):
         self.assertIn("Log line 1", data['logs'])
         self.assertEqual(data['status'], 'running')
     
-    @patch('builds.views.get_container_logs')
-    @patch('builds.views.get_container_status')
-    def test_get_logs_with_tail_parameter(self, mock_status, mock_logs):
+    def test_get_logs_with_tail_parameter(self):
         """Test getting container logs with tail parameter."""
-        mock_logs.return_value = "Last 50 lines"
-        mock_status.return_value = "running"
+        self.mock_logs.return_value = "Last 50 lines"
+        self.mock_status.return_value = "running"
         
-        url = reverse('container_logs', args=[self.build.id])
-        response = self.client.get(url, {'tail': '50'})
+        response = self.client.get(self.logs_url, {'tail': '50'})
         
         self.assertEqual(response.status_code, 200)
-        mock_logs.assert_called_once_with(self.build.container_id, tail=50)
+        self.mock_logs.assert_called_once_with(self.build.container_id, tail=50)
     
-    @patch('builds.views.get_container_logs')
-    @patch('builds.views.get_container_status')
-    def test_get_logs_invalid_tail_defaults_to_200(self, mock_status, mock_logs):
+    def test_get_logs_invalid_tail_defaults_to_200(self):
         """Test that invalid tail parameter defaults to 200."""
-        mock_logs.return_value = "Logs"
-        mock_status.return_value = "running"
+        self.mock_logs.return_value = "Logs"
+        self.mock_status.return_value = "running"
         
-        url = reverse('container_logs', args=[self.build.id])
-        response = self.client.get(url, {'tail': 'invalid'})
+        response = self.client.get(self.logs_url, {'tail': 'invalid'})
         
         self.assertEqual(response.status_code, 200)
-        mock_logs.assert_called_once_with(self.build.container_id, tail=200)
+        self.mock_logs.assert_called_once_with(self.build.container_id, tail=200)
     
-    @patch('builds.views.get_container_logs')
-    @patch('builds.views.get_container_status')
-    def test_get_logs_updates_container_status_when_exited(self, mock_status, mock_logs):
+    def test_get_logs_updates_container_status_when_exited(self):
         """Test that container status is updated when container exits."""
-        mock_logs.return_value = "Final logs"
-        mock_status.return_value = "exited"
+        self.mock_logs.return_value = "Final logs"
+        self.mock_status.return_value = "exited"
         
-        url = reverse('container_logs', args=[self.build.id])
-        response = self.client.get(url)
+        response = self.client.get(self.logs_url)
         
         self.assertEqual(response.status_code, 200)
         
         # Refresh build from database
-        self.build.refresh_from_db()
+        self.build.refresh_from_db(fields=['container_status'])
         self.assertEqual(self.build.container_status, 'stopped')
 
 
-class PortValidationTest(TestCase):
+class PortValidationTest(SimpleTestCase):
     """Tests for port validation helper."""
     
     def test_valid_port_string(self):
@@ -1402,6 +1473,7 @@ class PortValidationTest(TestCase):
         self.assertEqual(_validate_container_port('8080'), 8080)
         self.assertEqual(_validate_container_port('3000'), 3000)
         self.assertEqual(_validate_container_port('443'), 443)
+        self.assertEqual(_validate_container_port(' 3000 '), 3000)
     
     def test_valid_port_integer(self):
         """Test validation of valid port as integer."""
@@ -1442,42 +1514,39 @@ class PortValidationTest(TestCase):
 class ContainerControlViewsExtendedTest(TestCase):
     """Extended tests for container control views."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
-            name="main",
-            commit_sha="abc123"
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
-        self.build = Build.objects.create(
-            repository=self.repo,
-            commit=self.commit,
+        cls.build = Build.objects.create(
+            repository=cls.repo,
+            commit=cls.commit,
             branch_name="main",
             status="success",
             image_tag="test-repo:abc123de"
         )
+        cls.start_url = reverse('start_build_container', args=[cls.build.id])
+        cls.stop_url = reverse('stop_build_container', args=[cls.build.id])
+    
+    def setUp(self):
+        self.client.force_login(self.user)
     
     def test_start_container_already_running(self):
         """Test starting container when one is already running."""
@@ -1485,13 +1554,12 @@ class ContainerControlViewsExtendedTest(TestCase):
         self.build.container_id = 'existing123'
         self.build.save()
         
-        url = reverse('start_build_container', args=[self.build.id])
-        response = self.client.post(url)
+        response = self.client.post(self.start_url)
         
         self.assertEqual(response.status_code, 302)
         
         # Container status should remain unchanged
-        self.build.refresh_from_db()
+        self.build.refresh_from_db(fields=['container_status'])
         self.assertEqual(self.build.container_status, 'running')
     
     @patch('builds.views.start_container')
@@ -1502,13 +1570,12 @@ class ContainerControlViewsExtendedTest(TestCase):
         mock_exists.return_value = False
         mock_start.return_value = ("newcontainer123", 49152)
         
-        url = reverse('start_build_container', args=[self.build.id])
-        response = self.client.post(url)
+        response = self.client.post(self.start_url)
         
         self.assertEqual(response.status_code, 302)
         
         # Container info should be saved
-        self.build.refresh_from_db()
+        self.build.refresh_from_db(fields=['container_id', 'host_port', 'container_status'])
         self.assertEqual(self.build.container_id, "newcontainer123")
         self.assertEqual(self.build.host_port, 49152)
         self.assertEqual(self.build.container_status, 'running')
@@ -1519,13 +1586,12 @@ class ContainerControlViewsExtendedTest(TestCase):
         from builds.docker_utils import DockerError
         mock_start.side_effect = DockerError("Connection refused")
         
-        url = reverse('start_build_container', args=[self.build.id])
-        response = self.client.post(url)
+        response = self.client.post(self.start_url)
         
         self.assertEqual(response.status_code, 302)
         
         # Container status should be error
-        self.build.refresh_from_db()
+        self.build.refresh_from_db(fields=['container_status'])
         self.assertEqual(self.build.container_status, 'error')
     
     @patch('builds.views.stop_container')
@@ -1540,13 +1606,12 @@ class ContainerControlViewsExtendedTest(TestCase):
         mock_stop.return_value = True
         mock_remove.return_value = True
         
-        url = reverse('stop_build_container', args=[self.build.id])
-        response = self.client.post(url)
+        response = self.client.post(self.stop_url)
         
         self.assertEqual(response.status_code, 302)
         
         # Container info should be cleared
-        self.build.refresh_from_db()
+        self.build.refresh_from_db(fields=['container_id', 'host_port', 'container_status'])
         self.assertEqual(self.build.container_id, '')
         self.assertIsNone(self.build.host_port)
         self.assertEqual(self.build.container_status, 'stopped')
@@ -1562,49 +1627,43 @@ class ContainerControlViewsExtendedTest(TestCase):
         
         mock_stop.side_effect = DockerError("Timeout")
         
-        url = reverse('stop_build_container', args=[self.build.id])
-        response = self.client.post(url)
+        response = self.client.post(self.stop_url)
         
         self.assertEqual(response.status_code, 302)
         
         # Container info should remain unchanged
-        self.build.refresh_from_db()
+        self.build.refresh_from_db(fields=['container_id'])
         self.assertEqual(self.build.container_id, 'running123')
 
 
 class BuildDetailViewExtendedTest(TestCase):
     """Extended tests for build detail view with container info."""
     
-    def setUp(self):
-        self.client = Client()
-        
-        # Create and login a test user
-        self.user = User.objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        # Create a test user
+        cls.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
         
         # Create test data
-        self.repo = GitRepository.objects.create(
+        cls.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git"
         )
-        self.branch = Branch.objects.create(
-            repository=self.repo,
-            name="main",
-            commit_sha="abc123"
-        )
-        self.commit = Commit.objects.create(
-            repository=self.repo,
-            branch=self.branch,
+        cls.commit = Commit.objects.create(
+            repository=cls.repo,
             sha="abc123def456",
             message="Test commit",
             author="Test Author",
             author_email="test@example.com",
-            committed_at=timezone.now()
+            committed_at=_COMMITTED_AT
         )
     
+    def setUp(self):
+        self.client.force_login(self.user)
+    
     def test_build_detail_shows_container_url(self):
         """Test that build detail shows container URL when running."""
         build = Build.objects.create(
@@ -1622,8 +1681,9 @@ class BuildDetailViewExtendedTest(TestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, 200)
-        self.assertContains(response, "http://localhost:32768")
-        self.assertContains(response, "Application URL")
+        content = response.content.decode()
+        for text in ("http://localhost:32768", "Application URL"):
+            self.assertIn(text, content)
     
     def test_build_detail_shows_port_mapping(self):
         """Test that build detail shows port mapping info."""
@@ -1642,45 +1702,54 @@ class BuildDetailViewExtendedTest(TestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
         # Should show both container port and host port
-        self.assertContains(response, "3000")
-        self.assertContains(response, "49000")
+        for text in ("3000", "49000"):
+            self.assertIn(text, content)
 
 
 class BuildListSortingTest(TestCase):
     """Tests for build list sorting - alphabetically by repository name with active builds first."""
     
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse('build_list')
+        cls.user = User.objects.create_user(username='testuser', password='testpass')
+    
     def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username='testuser', password='testpass')
-        self.client.login(username='testuser', password='testpass')
-        self.url = reverse('build_list')
+        self.client.force_login(self.user)
     
     def test_builds_sorted_alphabetically_by_repository_name(self):
         """Test that builds are sorted alphabetically by repository name."""
         # Create repos in non-alphabetical order
-        repo_zebra = GitRepository.objects.create(name="zebra-repo", url="https://github.com/test/zebra.git")
-        repo_alpha = GitRepository.objects.create(name="alpha-repo", url="https://github.com/test/alpha.git")
-        repo_beta = GitRepository.objects.create(name="beta-repo", url="https://github.com/test/beta.git")
+        repo_zebra, repo_alpha, repo_beta = GitRepository.objects.bulk_create([
+            GitRepository(name="zebra-repo", url="https://github.com/test/zebra.git"),
+            GitRepository(name="alpha-repo", url="https://github.com/test/alpha.git"),
+            GitRepository(name="beta-repo", url="https://github.com/test/beta.git"),
+        ])
         
         # Create commits for each repo
-        commit_zebra = Commit.objects.create(
-            repository=repo_zebra, sha="abc123", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
-        commit_alpha = Commit.objects.create(
-            repository=repo_alpha, sha="def456", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
-        commit_beta = Commit.objects.create(
-            repository=repo_beta, sha="ghi789", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
+        commit_zebra, commit_alpha, commit_beta = Commit.objects.bulk_create([
+            Commit(
+                repository=repo_zebra, sha="abc123", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+            Commit(
+                repository=repo_alpha, sha="def456", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+            Commit(
+                repository=repo_beta, sha="ghi789", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+        ])
         
         # Create builds in different order
-        Build.objects.create(repository=repo_zebra, commit=commit_zebra, branch_name="main", status="success")
-        Build.objects.create(repository=repo_alpha, commit=commit_alpha, branch_name="main", status="success")
-        Build.objects.create(repository=repo_beta, commit=commit_beta, branch_name="main", status="success")
+        Build.objects.bulk_create([
+            Build(repository=repo_zebra, commit=commit_zebra, branch_name="main", status="success"),
+            Build(repository=repo_alpha, commit=commit_alpha, branch_name="main", status="success"),
+            Build(repository=repo_beta, commit=commit_beta, branch_name="main", status="success"),
+        ])
         
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
@@ -1695,28 +1764,34 @@ class BuildListSortingTest(TestCase):
     def test_active_builds_sorted_first(self):
         """Test that active (running/pending) builds appear before completed builds, then alphabetically."""
         # Create repos in different order
-        repo_alpha = GitRepository.objects.create(name="alpha-repo", url="https://github.com/test/alpha.git")
-        repo_beta = GitRepository.objects.create(name="beta-repo", url="https://github.com/test/beta.git")
-        repo_gamma = GitRepository.objects.create(name="gamma-repo", url="https://github.com/test/gamma.git")
+        repo_alpha, repo_beta, repo_gamma = GitRepository.objects.bulk_create([
+            GitRepository(name="alpha-repo", url="https://github.com/test/alpha.git"),
+            GitRepository(name="beta-repo", url="https://github.com/test/beta.git"),
+            GitRepository(name="gamma-repo", url="https://github.com/test/gamma.git"),
+        ])
         
         # Create commits
-        commit_alpha = Commit.objects.create(
-            repository=repo_alpha, sha="abc123", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
-        commit_beta = Commit.objects.create(
-            repository=repo_beta, sha="def456", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
-        commit_gamma = Commit.objects.create(
-            repository=repo_gamma, sha="ghi789", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
+        commit_alpha, commit_beta, commit_gamma = Commit.objects.bulk_create([
+            Commit(
+                repository=repo_alpha, sha="abc123", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+            Commit(
+                repository=repo_beta, sha="def456", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+            Commit(
+                repository=repo_gamma, sha="ghi789", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+        ])
         
         # Create builds: alpha=success, beta=running, gamma=pending
-        Build.objects.create(repository=repo_alpha, commit=commit_alpha, branch_name="main", status="success")
-        Build.objects.create(repository=repo_beta, commit=commit_beta, branch_name="main", status="running")
-        Build.objects.create(repository=repo_gamma, commit=commit_gamma, branch_name="main", status="pending")
+        Build.objects.bulk_create([
+            Build(repository=repo_alpha, commit=commit_alpha, branch_name="main", status="success"),
+            Build(repository=repo_beta, commit=commit_beta, branch_name="main", status="running"),
+            Build(repository=repo_gamma, commit=commit_gamma, branch_name="main", status="pending"),
+        ])
         
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
@@ -1734,46 +1809,54 @@ class BuildListSortingTest(TestCase):
 class ContainerListSortingTest(TestCase):
     """Tests for container list sorting - running containers first, then alphabetically by repository name."""
     
+    @classmethod
+    def setUpTestData(cls):
+        cls.url = reverse('container_list')
+        cls.user = User.objects.create_user(username='testuser', password='testpass')
+    
     def setUp(self):
-        self.client = Client()
-        self.user = User.objects.create_user(username='testuser', password='testpass')
-        self.client.login(username='testuser', password='testpass')
-        self.url = reverse('container_list')
+        self.client.force_login(self.user)
     
     def test_containers_sorted_alphabetically_by_repository_name(self):
         """Test that containers are sorted alphabetically by repository name."""
         # Create repos in non-alphabetical order
-        repo_zebra = GitRepository.objects.create(name="zebra-repo", url="https://github.com/test/zebra.git")
-        repo_alpha = GitRepository.objects.create(name="alpha-repo", url="https://github.com/test/alpha.git")
-        repo_beta = GitRepository.objects.create(name="beta-repo", url="https://github.com/test/beta.git")
+        repo_zebra, repo_alpha, repo_beta = GitRepository.objects.bulk_create([
+            GitRepository(name="zebra-repo", url="https://github.com/test/zebra.git"),
+            GitRepository(name="alpha-repo", url="https://github.com/test/alpha.git"),
+            GitRepository(name="beta-repo", url="https://github.com/test/beta.git"),
+        ])
         
         # Create commits
-        commit_zebra = Commit.objects.create(
-            repository=repo_zebra, sha="abc123", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
-        commit_alpha = Commit.objects.create(
-            repository=repo_alpha, sha="def456", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
-        commit_beta = Commit.objects.create(
-            repository=repo_beta, sha="ghi789", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
+        commit_zebra, commit_alpha, commit_beta = Commit.objects.bulk_create([
+            Commit(
+                repository=repo_zebra, sha="abc123", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+            Commit(
+                repository=repo_alpha, sha="def456", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+            Commit(
+                repository=repo_beta, sha="ghi789", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+        ])
         
         # Create successful builds (containers)
-        Build.objects.create(
-            repository=repo_zebra, commit=commit_zebra, branch_name="main",
-            status="success", container_status="stopped"
-        )
-        Build.objects.create(
-            repository=repo_alpha, commit=commit_alpha, branch_name="main",
-            status="success", container_status="stopped"
-        )
-        Build.objects.create(
-            repository=repo_beta, commit=commit_beta, branch_name="main",
-            status="success", container_status="stopped"
-        )
+        Build.objects.bulk_create([
+            Build(
+                repository=repo_zebra, commit=commit_zebra, branch_name="main",
+                status="success", container_status="stopped"
+            ),
+            Build(
+                repository=repo_alpha, commit=commit_alpha, branch_name="main",
+                status="success", container_status="stopped"
+            ),
+            Build(
+                repository=repo_beta, commit=commit_beta, branch_name="main",
+                status="success", container_status="stopped"
+            ),
+        ])
         
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
@@ -1788,37 +1871,43 @@ class ContainerListSortingTest(TestCase):
     def test_running_containers_sorted_first(self):
         """Test that running containers appear before stopped containers, then alphabetically."""
         # Create repos
-        repo_alpha = GitRepository.objects.create(name="alpha-repo", url="https://github.com/test/alpha.git")
-        repo_beta = GitRepository.objects.create(name="beta-repo", url="https://github.com/test/beta.git")
-        repo_gamma = GitRepository.objects.create(name="gamma-repo", url="https://github.com/test/gamma.git")
+        repo_alpha, repo_beta, repo_gamma = GitRepository.objects.bulk_create([
+            GitRepository(name="alpha-repo", url="https://github.com/test/alpha.git"),
+            GitRepository(name="beta-repo", url="https://github.com/test/beta.git"),
+            GitRepository(name="gamma-repo", url="https://github.com/test/gamma.git"),
+        ])
         
         # Create commits
-        commit_alpha = Commit.objects.create(
-            repository=repo_alpha, sha="abc123", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
-        commit_beta = Commit.objects.create(
-            repository=repo_beta, sha="def456", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
-        commit_gamma = Commit.objects.create(
-            repository=repo_gamma, sha="ghi789", message="Test",
-            author="Test", author_email="test@example.com", committed_at=timezone.now()
-        )
+        commit_alpha, commit_beta, commit_gamma = Commit.objects.bulk_create([
+            Commit(
+                repository=repo_alpha, sha="abc123", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+            Commit(
+                repository=repo_beta, sha="def456", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+            Commit(
+                repository=repo_gamma, sha="ghi789", message="Test",
+                author="Test", author_email="test@example.com", committed_at=_COMMITTED_AT
+            ),
+        ])
         
         # Create builds: alpha=stopped, beta=running, gamma=running
-        Build.objects.create(
-            repository=repo_alpha, commit=commit_alpha, branch_name="main",
-            status="success", container_status="stopped"
-        )
-        Build.objects.create(
-            repository=repo_beta, commit=commit_beta, branch_name="main",
-            status="success", container_status="running", host_port=8080, container_id="abc123"
-        )
-        Build.objects.create(
-            repository=repo_gamma, commit=commit_gamma, branch_name="main",
-            status="success", container_status="running", host_port=8081, container_id="def456"
-        )
+        Build.objects.bulk_create([
+            Build(
+                repository=repo_alpha, commit=commit_alpha, branch_name="main",
+                status="success", container_status="stopped"
+            ),
+            Build(
+                repository=repo_beta, commit=commit_beta, branch_name="main",
+                status="success", container_status="running", host_port=8080, container_id="abc123"
+            ),
+            Build(
+                repository=repo_gamma, commit=commit_gamma, branch_name="main",
+                status="success", container_status="running", host_port=8081, container_id="def456"
+            ),
+        ])
         
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, 200)
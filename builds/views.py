@@ -5,16 +5,22 @@ from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from django.utils import timezone
 from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.http.request import HttpHeaders
 from django.db.models import Case, When, Value, IntegerField
+from django.core.cache import cache
 from http.cookies import SimpleCookie
+from http.cookiejar import DefaultCookiePolicy
 from pathlib import Path
+from collections import namedtuple
+import functools
 import logging
 import threading
 import os
 import requests
+from requests.adapters import HTTPAdapter
 import re
 
-from .models import Build, DEFAULT_DOCKERFILE_TEMPLATE, get_dockerfile_templates, get_default_template, get_env_templates, get_default_env_template
+from .models import Build, PROXY_BUILD_CACHE_KEY, DEFAULT_DOCKERFILE_TEMPLATE, get_dockerfile_templates, get_default_template, get_env_templates, get_default_env_template
 from projects.models import GitRepository, Commit
 from projects.git_utils import (
     checkout_commit, clone_or_update_repo, GitUtilsError,
@@ -28,6 +34,64 @@ from .docker_utils import (
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session for the container proxy: keeps connections to the
+# containers alive between requests instead of reconnecting every time.
+# Its cookie jar blocks everything so container cookies are never stored
+# and replayed for another user.
+_SESSION = requests.Session()
+_SESSION.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=128))
+_SESSION.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+# HTTP methods forwarded by the proxy, and those that carry a request body
+_PROXY_METHODS = ('GET', 'POST', 'PUT', 'DELETE', 'PATCH')
+_PROXY_BODY_METHODS = ('POST', 'PUT', 'PATCH')
+
+# Chunk size used when streaming non-HTML container responses
+_PROXY_CHUNK_SIZE = 64 * 1024
+
+# Media types whose body gets its URLs rewritten to go through the proxy
+_PROXY_REWRITE_TYPES = frozenset({'text/html', 'application/xhtml+xml'})
+
+# Build fields needed by the proxy, cached for a few seconds per build so
+# proxied assets don't each hit the database and the Docker API.
+# proxy_base (/builds/ID/fwd), upstream_host (127.0.0.1:PORT) and
+# upstream_origin (http://127.0.0.1:PORT) are derived once per cache fill.
+_ProxyBuild = namedtuple(
+    '_ProxyBuild',
+    'id host_port container_status proxy_base upstream_host upstream_origin'
+)
+_PROXY_BUILD_CACHE_TIMEOUT = 5
+
+# Request META keys never forwarded to the container: Host, Cookie, Referer
+# and Origin are set by the proxy itself, the rest are hop-by-hop headers
+_SKIP_FORWARD_META = frozenset({
+    'HTTP_HOST',
+    'HTTP_COOKIE',
+    'HTTP_REFERER',
+    'HTTP_ORIGIN',
+    'HTTP_CONNECTION',
+    'HTTP_KEEP_ALIVE',
+    'HTTP_PROXY_AUTHORIZATION',
+    'HTTP_PROXY_CONNECTION',
+    'HTTP_TE',
+    'HTTP_TRAILER',
+    'HTTP_TRANSFER_ENCODING',
+    'HTTP_UPGRADE',
+})
+
+# NoHands' own cookies (nohands_sessionid, nohands_csrftoken, ...) in a Cookie
+# header, stripped before forwarding the header to the container
+_NOHANDS_COOKIE_RE = re.compile(r'(?:^|;\s*)nohands_[^=;]*=[^;]*')
+
+# Relative URLs in href/src/action attributes, double- and single-quoted
+# (matched on the raw HTML bytes)
+_REL_URL_ATTR_DQ_RE = re.compile(rb'(href|src|action)="(/[^"]*)"')
+_REL_URL_ATTR_SQ_RE = re.compile(rb"(href|src|action)='(/[^']*)'")
+
+
+# Valid TCP port numbers (1-65535) for a container port
+_VALID_PORTS = range(1, 65536)
+
 
 def _validate_container_port(port_value, default=8080):
     """
@@ -40,13 +104,17 @@ def _validate_container_port(port_value, default=8080):
     Returns:
         A valid port number between 1 and 65535
     """
-    try:
-        port = int(port_value) if port_value else default
-        if port < 1 or port > 65535:
+    # Plain ints and digit-only form values skip the try/except below
+    if type(port_value) is int:
+        port = port_value
+    elif isinstance(port_value, str) and port_value.isdecimal():
+        port = int(port_value)
+    else:
+        try:
+            port = int(port_value) if port_value else default
+        except (ValueError, TypeError):
             return default
-        return port
-    except (ValueError, TypeError):
-        return default
+    return port if port in _VALID_PORTS else default
 
 
 @login_required
@@ -90,7 +158,7 @@ def container_list(request):
 @login_required
 def build_detail(request, build_id):
     """View build details and logs."""
-    build = get_object_or_404(Build, id=build_id)
+    build = get_object_or_404(Build.objects.select_related('repository', 'commit'), id=build_id)
     
     # Sync container status with actual Docker state
     build.sync_container_status()
@@ -495,6 +563,84 @@ def execute_build(build_id: int):
             pass
 
 
+def _get_proxy_build(build_id):
+    """
+    Return the proxy's view of a build, with its container status synced.
+    
+    The result is cached for _PROXY_BUILD_CACHE_TIMEOUT seconds; saving or
+    deleting the build drops the cached entry (see builds.signals). With the
+    default per-process LocMemCache that only reaches the current process:
+    other workers may keep serving a stale port or status until the entry
+    times out.
+    """
+    key = PROXY_BUILD_CACHE_KEY.format(build_id)
+    proxy_build = cache.get(key)
+    if proxy_build is None:
+        build = get_object_or_404(Build, id=build_id)
+        
+        # Sync container status with actual Docker state
+        build.sync_container_status()
+        
+        upstream_host = f"127.0.0.1:{build.host_port}"
+        proxy_build = _ProxyBuild(
+            build.id,
+            build.host_port,
+            build.container_status,
+            f"/builds/{build.id}/fwd",
+            upstream_host,
+            f"http://{upstream_host}",
+        )
+        cache.set(key, proxy_build, _PROXY_BUILD_CACHE_TIMEOUT)
+    return proxy_build
+
+
+@functools.lru_cache(maxsize=256)
+def _forward_header_name(meta_key):
+    """Header name to forward for a request.META key, or None to skip it."""
+    if meta_key in _SKIP_FORWARD_META:
+        return None
+    return HttpHeaders.parse_header_name(meta_key)
+
+
+@functools.lru_cache(maxsize=256)
+def _container_location_re(host_port):
+    """Regex for an absolute redirect URL (localhost or 127.0.0.1) to a container port."""
+    return re.compile(rf'https?://(?:localhost|127\.0\.0\.1):{host_port}(/.*)')
+
+
+def _read_proxy_body(resp):
+    """
+    Read a streamed container response body in full, decompressed.
+    
+    Reads straight from the underlying urllib3 response into one buffer
+    rather than going through iter_content()'s per-chunk generator.
+    """
+    raw = resp.raw
+    raw.decode_content = True
+    buf = bytearray()
+    while True:
+        chunk = raw.read(_PROXY_CHUNK_SIZE)
+        if not chunk:
+            break
+        buf += chunk
+    return bytes(buf)
+
+
+def _needs_url_rewrite(content, host_port):
+    """
+    Cheap check for anything the proxy URL rewriting would change.
+    
+    Looks for absolute URLs to the container port and for quoted attribute
+    values starting with '/', so pages without them skip the regexes.
+    """
+    return (
+        b'="/' in content
+        or b"='/" in content
+        or b'localhost:%d' % host_port in content
+        or b'127.0.0.1:%d' % host_port in content
+    )
+
+
 @login_required
 @csrf_exempt  # Les POST sont destinés au conteneur, pas à Django NoHands
 def proxy_to_container(request, build_id, path=''):
@@ -510,10 +656,7 @@ def proxy_to_container(request, build_id, path=''):
     which has its own CSRF protection. Django's CSRF check would incorrectly reject
     these requests since the CSRF token comes from the container, not from Django.
     """
-    build = get_object_or_404(Build, id=build_id)
-    
-    # Sync container status with actual Docker state
-    build.sync_container_status()
+    build = _get_proxy_build(build_id)
     
     # Check if container is running
     if build.container_status != 'running' or not build.host_port:
@@ -523,7 +666,7 @@ def proxy_to_container(request, build_id, path=''):
         )
     
     # Build target URL
-    target_url = f"http://127.0.0.1:{build.host_port}/{path}"
+    target_url = f"{build.upstream_origin}/{path}"
     
     # Copy query parameters
     if request.GET:
@@ -532,31 +675,31 @@ def proxy_to_container(request, build_id, path=''):
     
     try:
         # Forward the request to the container
-        # Exclude NoHands-specific cookies to avoid session conflicts
-        headers = {
-            key: value for key, value in request.headers.items()
-            if key.lower() not in ['host', 'connection', 'cookie', 'referer', 'origin']
-        }
+        # Every request header is copied except hop-by-hop ones; Host,
+        # Referer, Origin and Cookie are set below
+        headers = {}
+        for key, value in request.META.items():
+            name = _forward_header_name(key)
+            if name:
+                headers[name] = value
         
         # Set proper headers for CSRF validation in the container
         # Django checks that Origin/Referer match the Host
-        headers['Host'] = f"127.0.0.1:{build.host_port}"
+        headers['Host'] = build.upstream_host
         if request.method == 'POST':
             # Set Referer to point to the same page on the container
             # This is required for Django CSRF validation
-            headers['Referer'] = f"http://127.0.0.1:{build.host_port}/{path}"
-            headers['Origin'] = f"http://127.0.0.1:{build.host_port}"
+            headers['Referer'] = f"{build.upstream_origin}/{path}"
+            headers['Origin'] = build.upstream_origin
         
         # Extract and forward only non-NoHands cookies to the container
-        if 'Cookie' in request.headers:
-            nohands_cookies = ['nohands_sessionid', 'nohands_csrftoken']
-            cookies = request.headers['Cookie'].split('; ')
-            filtered_cookies = [
-                cookie for cookie in cookies
-                if not any(cookie.startswith(f'{name}=') for name in nohands_cookies)
-            ]
+        if 'HTTP_COOKIE' in request.META:
+            filtered_cookies = request.META['HTTP_COOKIE']
+            # Usual case for container requests: nothing to strip
+            if 'nohands_' in filtered_cookies:
+                filtered_cookies = _NOHANDS_COOKIE_RE.sub('', filtered_cookies).lstrip('; ').strip()
             if filtered_cookies:
-                headers['Cookie'] = '; '.join(filtered_cookies)
+                headers['Cookie'] = filtered_cookies
                 logger.debug(f"Forwarding cookies to container: {headers['Cookie']}")
             else:
                 logger.debug("No cookies to forward to container")
@@ -564,85 +707,70 @@ def proxy_to_container(request, build_id, path=''):
             logger.debug("No Cookie header in request")
         
         # Make the request to the container
-        if request.method == 'GET':
-            resp = requests.get(target_url, headers=headers, stream=True, timeout=30)
-        elif request.method == 'POST':
+        if request.method not in _PROXY_METHODS:
+            return HttpResponse(f"Method {request.method} not supported", status=405)
+        
+        if request.method == 'POST':
             logger.info(f"POST to container: {target_url}")
             logger.info(f"Headers: Host={headers.get('Host')}, Referer={headers.get('Referer')}, Origin={headers.get('Origin')}")
             logger.info(f"Cookies: {headers.get('Cookie', 'None')}")
-            resp = requests.post(
-                target_url,
-                data=request.body,
-                headers=headers,
-                stream=True,
-                timeout=30
-            )
-        elif request.method == 'PUT':
-            resp = requests.put(
-                target_url,
-                data=request.body,
-                headers=headers,
-                stream=True,
-                timeout=30
-            )
-        elif request.method == 'DELETE':
-            resp = requests.delete(target_url, headers=headers, timeout=30)
-        elif request.method == 'PATCH':
-            resp = requests.patch(
-                target_url,
-                data=request.body,
-                headers=headers,
-                timeout=30
-            )
-        else:
-            return HttpResponse(f"Method {request.method} not supported", status=405)
         
-        # Get content type
+        resp = _SESSION.request(
+            request.method,
+            target_url,
+            data=request.body if request.method in _PROXY_BODY_METHODS else None,
+            headers=headers,
+            stream=True,
+            timeout=30
+        )
+        
+        # Get content type, and its media type without parameters
         content_type = resp.headers.get('content-type', '')
+        media_type = content_type.partition(';')[0].strip().lower()
+        
+        # Proxy base path
+        proxy_base = build.proxy_base
         
         # For HTML responses, rewrite URLs to use proxy path
-        if 'text/html' in content_type:
+        if media_type in _PROXY_REWRITE_TYPES:
             # Read full content for URL rewriting
-            content = resp.content.decode('utf-8', errors='replace')
-            
-            # Proxy base path
-            proxy_base = f"/builds/{build_id}/fwd"
-            
-            # Rewrite absolute URLs that point to localhost or container
-            # Pattern 1: http://localhost:PORT/path -> /builds/ID/fwd/path
-            content = re.sub(
-                rf'https?://localhost:{build.host_port}(/[^"\'\s]*)',
-                rf'{proxy_base}\1',
-                content
-            )
-            content = re.sub(
-                rf'https?://127\.0\.0\.1:{build.host_port}(/[^"\'\s]*)',
-                rf'{proxy_base}\1',
-                content
-            )
+            content = _read_proxy_body(resp)
             
-            # Pattern 2: Relative URLs starting with / -> /builds/ID/fwd/
-            # This handles href="/path" or src="/static/file.js"
-            content = re.sub(
-                r'(href|src|action)="(/[^"]*)"',
-                rf'\1="{proxy_base}\2"',
-                content
-            )
-            content = re.sub(
-                r"(href|src|action)='(/[^']*)'",
-                rf"\1='{proxy_base}\2'",
-                content
-            )
+            # Only run the rewrites if the body contains something to rewrite;
+            # otherwise the bytes are returned untouched
+            if _needs_url_rewrite(content, build.host_port):
+                base = proxy_base.encode()
+                
+                # Pattern 1: Relative URLs starting with / -> /builds/ID/fwd/
+                # This handles href="/path" or src="/static/file.js"
+                # (done first so rewritten absolute URLs are not prefixed twice)
+                content = _REL_URL_ATTR_DQ_RE.sub(rb'\1="' + base + rb'\2"', content)
+                content = _REL_URL_ATTR_SQ_RE.sub(rb"\1='" + base + rb"\2'", content)
+                
+                # Pattern 2: Absolute URLs that point to localhost or container
+                # http://localhost:PORT/path -> /builds/ID/fwd/path
+                for scheme in (b'http', b'https'):
+                    for host in (b'localhost', b'127.0.0.1'):
+                        content = content.replace(
+                            b'%s://%s:%d/' % (scheme, host, build.host_port),
+                            base + b'/'
+                        )
             
             # Rewrite Location header for redirects
             response = HttpResponse(content, status=resp.status_code, content_type=content_type)
         else:
-            # For non-HTML content, stream as before
+            # For non-HTML content, pipe the body through without buffering it
             response = StreamingHttpResponse(
-                resp.iter_content(chunk_size=8192),
+                resp.iter_content(chunk_size=_PROXY_CHUNK_SIZE),
                 status=resp.status_code,
                 content_type=content_type
             )
+            # Keep the upstream length when the body is passed through as-is
+            # (not chunked, and not decoded by requests)
+            if ('content-length' in resp.headers
+                    and 'transfer-encoding' not in resp.headers
+                    and 'content-encoding' not in resp.headers):
+                response['Content-Length'] = resp.headers['content-length']
         
         # Copy response headers
         excluded_headers = ['content-encoding', 'content-length', 'transfer-encoding', 'connection', 'location', 'set-cookie']
@@ -660,12 +788,12 @@ def proxy_to_container(request, build_id, path=''):
                 logger.info("Processing cookies from container")
             
             for cookie in resp.cookies:
-                logger.info(f"Setting cookie: {cookie.name}={cookie.value[:20]}... with Path=/builds/{build_id}/fwd/")
+                logger.info(f"Setting cookie: {cookie.name}={cookie.value[:20]}... with Path={proxy_base}/")
                 # Set the cookie with the modified path
                 kwargs = {
                     'key': cookie.name,
                     'value': cookie.value,
-                    'path': f'/builds/{build_id}/fwd/',
+                    'path': f'{proxy_base}/',
                 }
                 
                 # Add optional attributes only if they exist and are not None
@@ -693,18 +821,12 @@ def proxy_to_container(request, build_id, path=''):
         if 'location' in resp.headers:
             location = resp.headers['location']
             # Rewrite absolute URLs in redirects
-            location = re.sub(
-                rf'https?://localhost:{build.host_port}(/.*)',
-                rf'{proxy_base}\1',
-                location
-            )
-            location = re.sub(
-                rf'https?://127\.0\.0\.1:{build.host_port}(/.*)',
+            location, rewritten = _container_location_re(build.host_port).subn(
                 rf'{proxy_base}\1',
                 location
             )
             # Rewrite relative redirects
-            if location.startswith('/'):
+            if not rewritten and location.startswith('/'):
                 location = f'{proxy_base}{location}'
             response['Location'] = location
         
@@ -179,6 +179,9 @@ DOCKER_REGISTRY_PASSWORD = os.environ.get('DOCKER_REGISTRY_PASSWORD', '')
 # Max number of concurrent builds
 MAX_CONCURRENT_BUILDS = int(os.environ.get('MAX_CONCURRENT_BUILDS', '1'))
 
+# Start containers through the Docker Engine API instead of the `docker` CLI
+DOCKER_USE_SDK = os.environ.get('DOCKER_USE_SDK', 'False') == 'True'
+
 # Django Allauth Configuration
 AUTHENTICATION_BACKENDS = [
     # Needed to login by username in Django admin, regardless of `allauth`
@@ -219,3 +222,6 @@ SOCIALACCOUNT_STORE_TOKENS = True
 SESSION_COOKIE_NAME = 'nohands_sessionid'
 # Also customize CSRF cookie name for consistency
 CSRF_COOKIE_NAME = 'nohands_csrftoken'
+
+# Test runner: DEBUG test logs are shown only with -v 2
+TEST_RUNNER = 'nohands_project.test_runner.NoHandsTestRunner'
@@ -0,0 +1,84 @@
+"""
+Test runner du projet.
+
+Les tests CSRF journalisent leur déroulé via logger.debug(); ces messages ne
+sont affichés qu'avec `manage.py test -v 2` (ou plus).
+
+Les mots de passe sont hachés en MD5 pendant les tests: PBKDF2 est
+volontairement lent et dominerait le coût de create_user() et login().
+Les workers parallèles démarrés en spawn (macOS, Windows) n'héritent pas de
+ces réglages: ils les réappliquent à leur initialisation.
+
+Les tests tournent en parallèle par défaut (un processus et une base de
+test par cœur, ou DJANGO_TEST_PROCESSES); `--parallel 1` pour les lancer
+dans un seul processus, par exemple avec --pdb.
+"""
+import logging
+
+import django
+from django.test.runner import DiscoverRunner, ParallelTestSuite
+from django.test.utils import override_settings
+
+
+def _fast_password_hashers():
+    """override_settings() remplaçant PBKDF2 par le hacheur MD5."""
+    return override_settings(
+        PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+    )
+
+
+def _configure_root_logger(verbosity):
+    """Niveau du logger racine: DEBUG à partir de -v 2, WARNING sinon."""
+    root = logging.getLogger()
+    if verbosity >= 2:
+        root.setLevel(logging.DEBUG)
+        if not root.handlers:
+            root.addHandler(logging.StreamHandler())
+    else:
+        root.setLevel(logging.WARNING)
+
+
+def _setup_spawned_worker(verbosity):
+    """Réapplique les réglages du runner dans un worker démarré en spawn."""
+    # Django appelle ce hook avant django.setup(), or override_settings()
+    # a besoin des settings chargés
+    django.setup()
+    _fast_password_hashers().enable()
+    _configure_root_logger(verbosity)
+
+
+class _NoHandsParallelTestSuite(ParallelTestSuite):
+    """ParallelTestSuite dont les workers spawn reprennent les réglages du runner."""
+    
+    process_setup = _setup_spawned_worker
+
+
+class NoHandsTestRunner(DiscoverRunner):
+    """
+    DiscoverRunner qui règle le niveau de log racine selon la verbosité,
+    utilise un hacheur de mots de passe rapide et parallélise par défaut.
+    """
+    
+    parallel_test_suite = _NoHandsParallelTestSuite
+    
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.set_defaults(parallel='auto')
+    
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._fast_hashers = _fast_password_hashers()
+        self._fast_hashers.enable()
+        _configure_root_logger(self.verbosity)
+    
+    def build_suite(self, *args, **kwargs):
+        suite = super().build_suite(*args, **kwargs)
+        if isinstance(suite, ParallelTestSuite):
+            # Passé à _setup_spawned_worker dans chaque worker
+            suite.process_setup_args = (self.verbosity,)
+        return suite
+    
+    def teardown_test_environment(self, **kwargs):
+        self._fast_hashers.disable()
+        super().teardown_test_environment(**kwargs)
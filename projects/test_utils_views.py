@@ -335,7 +335,7 @@ class RepositoryListViewExtendedTest(TestCase):
     
     def test_shows_available_github_repos_with_token(self):
         """Test that available GitHub repos are shown when user has token."""
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         
         # Create social account and token
         from allauth.socialaccount.models import SocialAccount, SocialToken
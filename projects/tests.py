@@ -1,4 +1,4 @@
-from django.test import TestCase, Client, RequestFactory
+from django.test import TestCase, RequestFactory
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -130,14 +130,13 @@ class RepositoryListViewTest(TestCase):
     """Tests for repository list view."""
     
     def setUp(self):
-        self.client = Client()
         self.url = reverse('repository_list')
         # Create and login a test user
         self.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
     
     def test_view_url_accessible(self):
         """Test that the view is accessible."""
@@ -146,8 +145,13 @@ class RepositoryListViewTest(TestCase):
     
     def test_view_uses_correct_template(self):
         """Test that correct template is used."""
-        response = self.client.get(self.url)
-        self.assertTemplateUsed(response, 'projects/repository_list.html')
+        from .views import repository_list
+        
+        # Call the view directly: no middleware, session or auth round-trip
+        request = RequestFactory().get(self.url)
+        request.user = self.user
+        with self.assertTemplateUsed('projects/repository_list.html'):
+            repository_list(request)
     
     def test_view_shows_repositories(self):
         """Test that repositories are displayed."""
@@ -164,13 +168,12 @@ class RepositoryDetailViewTest(TestCase):
     """Tests for repository detail view."""
     
     def setUp(self):
-        self.client = Client()
         # Create and login a test user
         self.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         self.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git",
@@ -212,13 +215,12 @@ class BranchCommitsViewTest(TestCase):
     """Tests for branch commits view."""
     
     def setUp(self):
-        self.client = Client()
         # Create and login a test user
         self.user = User.objects.create_user(
             username='testuser',
             password='testpass'
         )
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         self.repo = GitRepository.objects.create(
             name="test-repo",
             url="https://github.com/test/repo.git",
@@ -520,7 +522,6 @@ class ConnectGitHubRepositoryViewTest(TestCase):
     """Tests for connecting GitHub repositories."""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(username='testuser', password='testpass')
         self.url = reverse('connect_github_repository')
     
@@ -537,7 +538,7 @@ class ConnectGitHubRepositoryViewTest(TestCase):
         from allauth.socialaccount.models import SocialToken
         mock_social_token.side_effect = SocialToken.DoesNotExist
         
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         response = self.client.get(self.url)
         
         self.assertEqual(response.status_code, 302)
@@ -545,7 +546,7 @@ class ConnectGitHubRepositoryViewTest(TestCase):
     
     def test_view_redirects_on_get(self):
         """Test that GET requests redirect to repository list."""
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         response = self.client.get(self.url)
         
         # The view now redirects GET requests to repository_list
@@ -560,7 +561,7 @@ class ConnectGitHubRepositoryViewTest(TestCase):
         mock_token.token = 'fake_token'
         mock_social_token.return_value = mock_token
         
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         
         response = self.client.post(self.url, {
             'repo_id': '123',
@@ -593,7 +594,7 @@ class ConnectGitHubRepositoryViewTest(TestCase):
             user=self.user
         )
         
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         
         response = self.client.post(self.url, {
             'repo_id': '123',
@@ -653,7 +654,6 @@ class InitialSetupViewTest(TestCase):
     """Tests for the initial setup view."""
     
     def setUp(self):
-        self.client = Client()
         self.url = reverse('initial_setup')
     
     def test_view_accessible_without_users(self):
@@ -747,9 +747,8 @@ class RepositorySortingTest(TestCase):
     """Tests for repository sorting in repository list view."""
     
     def setUp(self):
-        self.client = Client()
         self.user = User.objects.create_user(username='testuser', password='testpass')
-        self.client.login(username='testuser', password='testpass')
+        self.client.force_login(self.user)
         self.url = reverse('repository_list')
     
     def test_connected_repositories_sorted_alphabetically(self):